@@ -1,11 +1,7 @@
 #!/usr/bin/env python3
 
-import tkinter as tk
-from tkinter import ttk
 import os
 
-from gui.image_display_widget import create_default_image_display
-
 class BundleGeneric:
     def create_bundle(self, bundle_content, app):
         pass
@@ -13,10 +9,15 @@ class BundleGeneric:
     def create_display(self, bundle_content, app):
         """Crear el display para un bundle genérico"""
         images = bundle_content.get('images', [])
-        num_images = len(images)
-        # Crear solo los displays necesarios según cantidad de imágenes
-        for i in range(num_images):
-            image_path = os.path.join(app.current_project.directory, images[i])
-            display_frame = ttk.Frame(app.images_frame)
-            display_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-            create_default_image_display(app, display_frame, image_path)
+        # Prefijo del directorio calculado una sola vez (termina en separador)
+        base = os.path.join(app.current_project.directory, '')
+        # Reutilizar los displays ya creados: solo cambia la imagen mostrada
+        displays = app.prepare_display_slots(len(images))
+        for display, image_name in zip(displays, images):
+            # Un stat por imagen del bundle (no por archivo del proyecto)
+            image_path = base + image_name
+            try:
+                mtime = os.stat(image_path).st_mtime
+            except OSError:
+                mtime = None  # El display muestra el error de carga
+            display.show(image_path, mtime)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Ejemplo de uso de ConfigUtils.
+
+Ejecutar desde source/cam_utils/examples/ o cualquier otra carpeta:
+    python3 config_utils_example.py
+"""
+
+import os
+import sys
+
+# Permitir importar los módulos de cam_utils sin instalarlos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gphoto2_config_utils import ConfigUtils
+
+
+def example_usage():
+    """Ejemplo de uso del controlador extendido"""
+    download_folder = "./captured_images"
+    
+    try:
+        with ConfigUtils(download_folder, use_camera_ram=True) as camera:
+            print("=== EXPLORANDO CONFIGURACIONES ===")
+            
+            # Obtener todas las claves disponibles
+            all_keys = camera.get_all_config_keys()
+            print(f"Total de configuraciones disponibles: {len(all_keys)}")
+            
+            # Mostrar algunas configuraciones comunes
+            print("\n=== CONFIGURACIONES COMUNES ===")
+            common = camera.get_common_settings()
+            for name, config in common.items():
+                if config:
+                    print(f"{name}: {config['current_value']} "
+                          f"(opciones: {len(config['choices'])})")
+                else:
+                    print(f"{name}: No disponible")
+            
+            # Ejemplo: Obtener configuración específica
+            print("\n=== CONFIGURACIÓN ESPECÍFICA (ISO) ===")
+            iso_config = camera.get_config_value('iso')
+            if iso_config:
+                print(f"ISO actual: {iso_config['current_value']}")
+                print(f"Opciones ISO disponibles: {iso_config['choices']}")
+            
+            # Ejemplo: Modificar configuración
+            print("\n=== MODIFICANDO CONFIGURACIONES ===")
+            changes = {
+                'iso': '400',
+                'image_quality': 'Fine'
+            }
+            
+            results = camera.set_common_settings(changes)
+            for setting, success in results.items():
+                status = "✅ Exitoso" if success else "❌ Error"
+                print(f"{setting}: {status}")
+            
+            # Mostrar configuraciones filtradas
+            print("\n=== CONFIGURACIONES RELACIONADAS CON ISO ===")
+            camera.print_all_configurations('iso')
+            
+            # Capturar imagen con nueva configuración
+            print("\n=== CAPTURANDO IMAGEN ===")
+            captured = camera.capture_and_download("imagen_configurada.jpg")
+            if captured:
+                print(f"✅ Imagen capturada: {captured}")
+            
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+
+if __name__ == "__main__":
+    example_usage()
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
 import os
+import json
 import logging
+import queue
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -16,6 +21,131 @@ except ImportError:
     )
 
 
+# Cache en disco del destino de captura elegido para cada modelo de cámara
+_CACHE_DIR = Path.home() / ".cache" / "copista"
+_CONFIG_CACHE_FILE = _CACHE_DIR / "camconfig.json"
+_LAST_PORT_FILE = _CACHE_DIR / "last_port"
+_CONFIG_CACHE: Optional[Dict[str, Dict[str, str]]] = None
+
+
+def _load_config_cache() -> Dict[str, Dict[str, str]]:
+    """Cargar (una sola vez por proceso) el cache de configuración desde disco"""
+    global _CONFIG_CACHE
+    if _CONFIG_CACHE is None:
+        try:
+            with open(_CONFIG_CACHE_FILE, 'r', encoding='utf-8') as f:
+                _CONFIG_CACHE = json.load(f)
+        except (OSError, ValueError):
+            _CONFIG_CACHE = {}
+    return _CONFIG_CACHE
+
+
+def _save_config_cache() -> None:
+    """Persistir el cache de configuración en disco"""
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_CONFIG_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(_load_config_cache(), f, indent=2, ensure_ascii=False)
+    except OSError:
+        pass  # El cache es opcional
+
+
+# Lista de puertos y resultado de autodetección compartidos entre instancias
+_port_info_list = None
+_port_info_lock = threading.Lock()
+_AUTODETECT_TTL = 2.0
+_autodetect_cache = (0.0, None)
+
+
+def _get_port_info_list(reload: bool = False):
+    """Obtener la PortInfoList compartida, cargándola solo la primera vez"""
+    global _port_info_list
+    if _port_info_list is None or reload:
+        with _port_info_lock:
+            if _port_info_list is None or reload:
+                port_info_list = gp.PortInfoList()
+                port_info_list.load()
+                _port_info_list = port_info_list
+    return _port_info_list
+
+
+def _autodetect_cameras(context):
+    """Autodetectar cámaras, reutilizando el resultado por unos segundos"""
+    global _autodetect_cache
+    timestamp, camera_list = _autodetect_cache
+    if camera_list is not None and time.monotonic() - timestamp < _AUTODETECT_TTL:
+        return camera_list
+    try:
+        camera_list = list(gp.check_result(gp.gp_camera_autodetect(context)))
+    except gp.GPhoto2Error:
+        _autodetect_cache = (0.0, None)
+        raise
+    _autodetect_cache = (time.monotonic(), camera_list)
+    return camera_list
+
+
+class FileInfo:
+    """Información de un archivo en la cámara (registro compacto con __slots__)"""
+    
+    __slots__ = ('folder', 'name', 'size', 'mtime')
+    
+    def __init__(self, folder: str, name: str, size: int, mtime: int):
+        self.folder = folder
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+    
+    def __repr__(self) -> str:
+        return f"FileInfo({self.folder}/{self.name}, {self.size} bytes)"
+
+
+class _DownloadWorker(threading.Thread):
+    """
+    Hilo consumidor que descarga las imágenes capturadas.
+    Permite que la transferencia USB de una captura se superponga con el
+    disparo de la siguiente.
+    """
+
+    def __init__(self, controller: "CaptureController", max_pending: int = 4):
+        super().__init__(name="CaptureDownloadWorker", daemon=True)
+        self.controller = controller
+        self.jobs = queue.Queue(maxsize=max_pending)
+
+    def submit(self, folder: str, name: str, local_path: str,
+               delete_from_camera: bool) -> Future:
+        """Encolar una descarga y devolver un Future con la ruta local (o None)"""
+        future = Future()
+        self.jobs.put((folder, name, local_path, delete_from_camera, future))
+        return future
+
+    def stop(self) -> None:
+        """Terminar el hilo luego de procesar las descargas pendientes"""
+        self.jobs.put(None)
+        self.join()
+
+    def run(self) -> None:
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            folder, name, local_path, delete_from_camera, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = self.controller._download_camera_file(
+                    folder, name, local_path, delete_from_camera
+                )
+                self.controller._clear_post_capture_events()
+                self.controller.logger.info(f"Imagen descargada exitosamente: {local_path}")
+            except gp.GPhoto2Error as e:
+                self.controller.logger.error(f"Error de gPhoto2 durante descarga: {e}")
+                result = None
+            except Exception as e:
+                self.controller.logger.error(f"Error inesperado durante descarga: {e}")
+                result = None
+            future.set_result(result)
+
+
 class CaptureController:
     """
     Controlador de camara usando gphoto2.
@@ -34,11 +164,21 @@ class CaptureController:
                                  Si False, captura en tarjeta SD
         """
         self.download_folder = Path(download_folder)
+        # Prefijo precalculado para armar rutas de descarga sin crear objetos Path
+        self._download_prefix = f"{self.download_folder}{os.sep}"
         self.camera_port = camera_port
         self.use_camera_ram = use_camera_ram
         self.camera = None
         self.context = None
         
+        # libgphoto2 no es reentrante: todo acceso a la cámara pasa por este lock
+        self._camera_lock = threading.RLock()
+        self._download_worker = None
+        self._pending_downloads = []
+        
+        # Cache de listados por carpeta de la cámara: {carpeta: (archivos, subcarpetas)}
+        self._folder_cache = {}
+        
         # Configurar logging
         self.logger = self._setup_logging()
         
@@ -81,22 +221,28 @@ class CaptureController:
             # Inicializar cámara
             self.camera = gp.Camera()
             
-            # Intentar detectar cámara automáticamente primero
-            if not self._try_auto_detect():
-                # Si falla detección automática, usar puerto específico
-                if self.camera_port:
-                    if not self._try_specific_port():
+            # Probar primero el último puerto que funcionó
+            if not self._try_last_known_port():
+                # Intentar detectar cámara automáticamente
+                if not self._try_auto_detect():
+                    # Si falla detección automática, usar puerto específico
+                    if self.camera_port:
+                        if not self._try_specific_port():
+                            return False
+                    else:
+                        self.logger.error("No se pudo detectar la cámara automáticamente")
                         return False
-                else:
-                    self.logger.error("No se pudo detectar la cámara automáticamente")
-                    return False
-            
-            # Inicializar conexión
-            self.camera.init(self.context)
+                
+                # Inicializar conexión
+                self.camera.init(self.context)
             
             # Configurar destino de captura
             self._configure_capture_target()
             
+            # Iniciar hilo de descargas en segundo plano
+            self._download_worker = _DownloadWorker(self)
+            self._download_worker.start()
+            
             # Obtener información de la cámara
             camera_info = self._get_camera_info()
             self.logger.info(f"Conectado exitosamente: {camera_info}")
@@ -111,13 +257,49 @@ class CaptureController:
             self.logger.error(f"Error inesperado al conectar: {e}")
             return False
     
+    def _try_last_known_port(self) -> bool:
+        """
+        Intentar conectar (init incluido) en el último puerto que funcionó,
+        sin pasar por la autodetección. Solo si no se indicó un puerto.
+        """
+        if self.camera_port:
+            return False
+        try:
+            last_port = _LAST_PORT_FILE.read_text(encoding='utf-8').strip()
+        except OSError:
+            return False
+        if not last_port:
+            return False
+        
+        self.logger.info(f"Probando último puerto conocido: {last_port}")
+        self.camera_port = last_port
+        try:
+            if self._try_specific_port():
+                self.camera.init(self.context)
+                return True
+        except gp.GPhoto2Error as e:
+            self.logger.info(f"El último puerto conocido no responde: {e}")
+        
+        # Volver a empezar con una cámara nueva y autodetección
+        self.camera = gp.Camera()
+        self.camera_port = None
+        return False
+    
+    def _save_last_port(self) -> None:
+        """Recordar el puerto de la sesión actual para la próxima conexión"""
+        try:
+            _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _LAST_PORT_FILE.write_text(self.camera_port, encoding='utf-8')
+        except OSError:
+            pass  # El cache es opcional
+    
     def _try_auto_detect(self) -> bool:
         """Intentar detectar la cámara automáticamente"""
         try:
             self.logger.info("Intentando detección automática de cámara...")
             
             # Listar cámaras disponibles
-            camera_list = gp.check_result(gp.gp_camera_autodetect(self.context))
+            camera_list = _autodetect_cameras(self.context)
             
             if not camera_list:
                 self.logger.warning("No se detectaron cámaras automáticamente")
@@ -151,12 +333,16 @@ class CaptureController:
         """Intentar conectar usando puerto específico"""
         try:
             self.logger.info(f"Configurando puerto específico: {self.camera_port}")
-            port_info_list = gp.PortInfoList()
-            port_info_list.load()
+            port_info_list = _get_port_info_list()
             
             # Buscar puerto exacto
             try:
-                idx = port_info_list.lookup_path(self.camera_port)
+                try:
+                    idx = port_info_list.lookup_path(self.camera_port)
+                except gp.GPhoto2Error:
+                    # La lista compartida puede estar desactualizada (re-enumeración USB)
+                    port_info_list = _get_port_info_list(reload=True)
+                    idx = port_info_list.lookup_path(self.camera_port)
                 self.camera.set_port_info(port_info_list[idx])
                 return True
             except gp.GPhoto2Error:
@@ -173,13 +359,14 @@ class CaptureController:
         """Listar puertos disponibles para debugging"""
         try:
             self.logger.info("Puertos USB disponibles:")
-            port_info_list = gp.PortInfoList()
-            port_info_list.load()
+            port_info_list = _get_port_info_list()
             
+            usb_type = gp.GP_PORT_USB
+            log_info = self.logger.info
             for i in range(port_info_list.count()):
                 port_info = port_info_list.get_info(i)
-                if 'usb' in port_info.path.lower():
-                    self.logger.info(f"  - {port_info.path}")
+                if port_info.type == usb_type:
+                    log_info("  - %s", port_info.path)
                     
         except Exception as e:
             self.logger.warning(f"No se pudieron listar puertos: {e}")
@@ -218,12 +405,21 @@ class CaptureController:
     def disconnect(self) -> None:
         """Desconectar de la cámara y liberar recursos"""
         try:
+            # Terminar las descargas pendientes antes de cerrar la conexión
+            if self._download_worker:
+                self._download_worker.stop()
+                # La sesión fue exitosa: recordar el puerto
+                if self.camera_port:
+                    self._save_last_port()
             if self.camera:
                 self.camera.exit(self.context)
                 self.logger.info("Cámara desconectada exitosamente")
         except Exception as e:
             self.logger.error(f"Error al desconectar: {e}")
         finally:
+            self._download_worker = None
+            self._pending_downloads = []
+            self._folder_cache = {}
             self.camera = None
             self.context = None
     
@@ -242,21 +438,29 @@ class CaptureController:
             
         try:
             self.logger.debug("Esperando que la cámara esté lista...")
-            start_time = time.time()
+            deadline = time.monotonic() + timeout_seconds
             
-            while time.time() - start_time < timeout_seconds:
-                try:
-                    # Esperar eventos con timeout corto
-                    event_type, event_data = self.camera.wait_for_event(500, self.context)
-                    self.logger.debug(f"Evento detectado: {event_type}")
-                    
-                    # Si recibimos ciertos eventos, la cámara está lista
-                    if event_type in [gp.GP_EVENT_UNKNOWN, gp.GP_EVENT_TIMEOUT]:
-                        return True
+            with self._camera_lock:
+                while True:
+                    remaining_ms = int((deadline - time.monotonic()) * 1000)
+                    if remaining_ms <= 0:
+                        break
+                    try:
+                        # Una ventana de 500 ms sin eventos indica que la cámara está lista;
+                        # la última espera se recorta al tiempo restante
+                        event_type, event_data = self.camera.wait_for_event(
+                            min(500, remaining_ms), self.context
+                        )
+                        self.logger.debug("Evento detectado: %s", event_type)
                         
-                except gp.GPhoto2Error:
-                    # Si no hay más eventos, probablemente esté lista
-                    return True
+                        # Si recibimos ciertos eventos, la cámara está lista
+                        if event_type in (gp.GP_EVENT_UNKNOWN, gp.GP_EVENT_TIMEOUT,
+                                          gp.GP_EVENT_CAPTURE_COMPLETE):
+                            return True
+                            
+                    except gp.GPhoto2Error:
+                        # Si no hay más eventos, probablemente esté lista
+                        return True
             
             self.logger.warning(f"Timeout esperando que la cámara esté lista ({timeout_seconds}s)")
             return False
@@ -268,13 +472,24 @@ class CaptureController:
     def _get_camera_info(self) -> str:
         """Obtener información básica de la cámara"""
         try:
-            summary = self.camera.get_summary(self.context)
-            return str(summary).split('\n')[0]
-        except:
+            text = self.camera.get_summary(self.context).text
+            # Solo interesa la primera línea: evitar partir todo el resumen
+            newline = text.find('\n')
+            return text if newline < 0 else text[:newline]
+        except gp.GPhoto2Error:
             return "Canon T7 (información no disponible)"
     
     def _configure_capture_target(self) -> None:
         """Configurar el destino de captura (RAM o tarjeta SD)"""
+        cache_key = self._capture_target_cache_key()
+        cached = _load_config_cache().get(cache_key)
+        if cached:
+            if self._apply_cached_capture_target(cached):
+                return
+            # El valor guardado ya no sirve: invalidar y redescubrir
+            del _load_config_cache()[cache_key]
+            _save_config_cache()
+        
         try:
             config = self.camera.get_config(self.context)
             
@@ -291,56 +506,53 @@ class CaptureController:
                     return
             
             if capture_target:
-                # Obtener las opciones disponibles
+                chosen_value = None
+                
+                # Obtener las opciones disponibles una sola vez
                 choices = []
                 try:
-                    choice_count = capture_target.count_choices()
-                    for i in range(choice_count):
-                        choice = capture_target.get_choice(i)
-                        choices.append(choice)
+                    choices = [capture_target.get_choice(i)
+                               for i in range(capture_target.count_choices())]
                     self.logger.info(f"Opciones de capturetarget disponibles: {choices}")
-                except:
+                except gp.GPhoto2Error:
                     pass
+                available = frozenset(choices)
                 
                 if self.use_camera_ram:
                     # Configurar para captura en RAM
-                    # Opciones comunes: "Internal RAM", "SDRAM", 0
-                    target_values = ["Internal RAM", "SDRAM", "RAM", "0"]
-                    for target_value in target_values:
-                        try:
-                            if target_value in choices:
-                                capture_target.set_value(target_value)
-                                self.logger.info(f"Configurado capturetarget a: {target_value}")
-                                break
-                            elif target_value == "0" and len(choices) > 0:
-                                capture_target.set_value(choices[0])  # Primer opción disponible
-                                self.logger.info(f"Configurado capturetarget a: {choices[0]} (primera opción)")
-                                break
-                        except gp.GPhoto2Error as e:
-                            self.logger.debug(f"No se pudo configurar a {target_value}: {e}")
-                            continue
+                    # Opciones comunes: "Internal RAM", "SDRAM", o la primera opción
+                    target_values = ("Internal RAM", "SDRAM", "RAM")
+                    fallback_index, fallback_label = 0, "primera opción"
                 else:
                     # Configurar para captura en tarjeta SD
-                    # Opciones comunes: "Memory card", "SD", 1
-                    target_values = ["Memory card", "SD", "Card", "1"]
-                    for target_value in target_values:
-                        try:
-                            if target_value in choices:
-                                capture_target.set_value(target_value)
-                                self.logger.info(f"Configurado capturetarget a: {target_value}")
-                                break
-                            elif target_value == "1" and len(choices) > 1:
-                                capture_target.set_value(choices[1])  # Segunda opción si existe
-                                self.logger.info(f"Configurado capturetarget a: {choices[1]} (segunda opción)")
-                                break
-                        except gp.GPhoto2Error as e:
-                            self.logger.debug(f"No se pudo configurar a {target_value}: {e}")
-                            continue
+                    # Opciones comunes: "Memory card", "SD", o la segunda opción
+                    target_values = ("Memory card", "SD", "Card")
+                    fallback_index, fallback_label = 1, "segunda opción"
+                
+                candidates = [(value, "") for value in target_values if value in available]
+                if len(choices) > fallback_index:
+                    candidates.append((choices[fallback_index], f" ({fallback_label})"))
+                
+                for target_value, note in candidates:
+                    try:
+                        capture_target.set_value(target_value)
+                        chosen_value = target_value
+                        self.logger.info(f"Configurado capturetarget a: {target_value}{note}")
+                        break
+                    except gp.GPhoto2Error as e:
+                        self.logger.debug("No se pudo configurar a %s: %s", target_value, e)
                 
                 # Aplicar configuración
                 try:
                     self.camera.set_config(config, self.context)
                     self.logger.info("Configuración de capturetarget aplicada exitosamente")
+                    if chosen_value is not None:
+                        _load_config_cache()[cache_key] = {
+                            'name': capture_target.get_name(),
+                            'value': chosen_value,
+                            'choices': choices
+                        }
+                        _save_config_cache()
                 except gp.GPhoto2Error as e:
                     self.logger.warning(f"No se pudo aplicar configuración capturetarget: {e}")
                 
@@ -349,16 +561,48 @@ class CaptureController:
             if not self.use_camera_ram:
                 self.logger.warning("Asegúrate de que la cámara tenga una tarjeta SD insertada")
     
+    def _capture_target_cache_key(self) -> str:
+        """Clave del cache de capturetarget: modelo de cámara + modo de captura"""
+        try:
+            model = self.camera.get_abilities().model
+        except gp.GPhoto2Error:
+            model = self.camera_port
+        return f"{model}:{self.use_camera_ram}"
+    
+    def _apply_cached_capture_target(self, cached: Dict[str, str]) -> bool:
+        """
+        Aplicar un destino de captura ya conocido sin recorrer todo el árbol
+        de configuración.
+        
+        Returns:
+            bool: True si se aplicó, False si hay que redescubrir
+        """
+        try:
+            widget = self.camera.get_single_config(cached['name'], self.context)
+            widget.set_value(cached['value'])
+            self.camera.set_single_config(cached['name'], widget, self.context)
+            self.logger.info(f"Configurado capturetarget a: {cached['value']} (cache)")
+            return True
+        except (gp.GPhoto2Error, KeyError) as e:
+            self.logger.debug("No se pudo aplicar capturetarget desde cache: %s", e)
+            return False
+    
     def capture_and_download(self, filename: Optional[str] = None, 
-                           delete_from_camera: bool = True) -> Optional[str]:
+                           delete_from_camera: bool = True,
+                           wait: bool = True) -> Optional[str]:
         """
         Capturar una imagen y descargarla automáticamente.
         
+        La descarga se realiza en un hilo de fondo, de modo que con wait=False
+        se puede disparar la siguiente captura mientras se transfiere la anterior.
+        
         Args:
             filename (str, optional): Nombre del archivo. Si no se especifica, 
                                     se genera automáticamente con timestamp
             delete_from_camera (bool): Si eliminar la imagen de la cámara después 
                                      de descargarla
+            wait (bool): Si True, espera a que termine la descarga. Si False,
+                         retorna la ruta de inmediato (usar wait_all_downloads())
         
         Returns:
             str: Ruta completa del archivo descargado, o None si hubo error
@@ -368,63 +612,46 @@ class CaptureController:
             return None
         
         try:
-            self.logger.info("Iniciando captura de imagen...")
-            
-            # SOLUCIÓN PARA ERROR "E/S en curso": Esperar eventos antes de capturar
-            self.logger.info("Esperando que la cámara esté lista...")
-            try:
-                # Esperar eventos por 1 segundo para limpiar el buffer
-                event_type, event_data = self.camera.wait_for_event(1000, self.context)
-                self.logger.debug(f"Evento recibido: {event_type}")
-            except gp.GPhoto2Error as e:
-                self.logger.debug(f"No hay eventos pendientes: {e}")
-            
-            # Pequeña pausa adicional para asegurar que la cámara esté lista
-            time.sleep(0.5)
-            
-            # Capturar imagen
-            if self.use_camera_ram:
-                # Para captura en RAM, usar capture directo y descargar inmediatamente
-                file_path = self.camera.capture(gp.GP_CAPTURE_IMAGE, self.context)
-                self.logger.info(f"Imagen capturada en RAM: {file_path.folder}/{file_path.name}")
-            else:
-                # Para captura en SD, usar captura normal
-                file_path = self.camera.capture(gp.GP_CAPTURE_IMAGE, self.context)
-                self.logger.info(f"Imagen capturada en SD: {file_path.folder}/{file_path.name}")
+            with self._camera_lock:
+                self.logger.info("Iniciando captura de imagen...")
+                
+                # SOLUCIÓN PARA ERROR "E/S en curso": vaciar eventos antes de capturar
+                self.logger.info("Esperando que la cámara esté lista...")
+                self._drain_events(max_wait_ms=1500)
+                
+                # Disparar sin bloquear y esperar el evento de archivo nuevo
+                self.camera.trigger_capture(self.context)
+                file_path = self._wait_for_file_added()
+                if self.use_camera_ram:
+                    self.logger.info(f"Imagen capturada en RAM: {file_path.folder}/{file_path.name}")
+                else:
+                    self.logger.info(f"Imagen capturada en SD: {file_path.folder}/{file_path.name}")
+                    # La carpeta tiene un archivo nuevo: su listado en cache ya no es válido
+                    self._folder_cache.pop(file_path.folder, None)
             
             # Generar nombre de archivo si no se especifica
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                extension = Path(file_path.name).suffix
+                dot = file_path.name.rfind('.')
+                extension = file_path.name[dot:] if dot >= 0 else ''
                 filename = f"canon_eos_1500d_{timestamp}{extension}"
             
             # Ruta completa del archivo de destino
-            local_path = self.download_folder / filename
+            local_path = self._download_prefix + filename
             
-            # Descargar imagen
-            self.logger.info(f"Descargando imagen a: {local_path}")
-            camera_file = self.camera.file_get(
-                file_path.folder, file_path.name, 
-                gp.GP_FILE_TYPE_NORMAL, self.context
-            )
-            camera_file.save(str(local_path))
-            
-            # Eliminar de la cámara si se solicita (y no está en RAM)
-            if delete_from_camera and not self.use_camera_ram:
-                self.logger.info("Eliminando imagen de la cámara...")
-                self.camera.file_delete(file_path.folder, file_path.name, self.context)
-            elif self.use_camera_ram:
+            # Encolar la descarga (y eliminación si no está en RAM) en el hilo de fondo
+            if self.use_camera_ram:
                 self.logger.info("Imagen capturada en RAM - se elimina automáticamente")
+            future = self._download_worker.submit(
+                file_path.folder, file_path.name, local_path,
+                delete_from_camera and not self.use_camera_ram
+            )
             
-            # Esperar eventos después de la captura para limpiar el buffer
-            try:
-                event_type, event_data = self.camera.wait_for_event(500, self.context)
-                self.logger.debug(f"Evento post-captura: {event_type}")
-            except gp.GPhoto2Error:
-                pass  # No hay problema si no hay eventos
+            if not wait:
+                self._pending_downloads.append(future)
+                return local_path
             
-            self.logger.info(f"Imagen descargada exitosamente: {local_path}")
-            return str(local_path)
+            return future.result()
             
         except gp.GPhoto2Error as e:
             self.logger.error(f"Error de gPhoto2 durante captura: {e}")
@@ -432,9 +659,10 @@ class CaptureController:
                 self.logger.info("Error E/S en curso - intentando limpiar buffer de eventos...")
                 try:
                     # Intentar limpiar el buffer de eventos
-                    for _ in range(3):
-                        event_type, event_data = self.camera.wait_for_event(1000, self.context)
-                        self.logger.debug(f"Limpiando evento: {event_type}")
+                    with self._camera_lock:
+                        for _ in range(3):
+                            event_type, event_data = self.camera.wait_for_event(1000, self.context)
+                            self.logger.debug("Limpiando evento: %s", event_type)
                 except gp.GPhoto2Error:
                     pass
                 self.logger.info("Buffer limpiado. Intenta capturar de nuevo en unos segundos.")
@@ -443,23 +671,123 @@ class CaptureController:
             self.logger.error(f"Error inesperado durante captura: {e}")
             return None
     
-    def list_files_on_camera(self) -> List[Dict[str, Any]]:
+    def _wait_for_file_added(self, timeout_seconds: float = 10):
+        """
+        Esperar el evento GP_EVENT_FILE_ADDED que sigue a trigger_capture().
+        
+        Returns:
+            CameraFilePath: Carpeta y nombre del archivo capturado en la cámara
+        
+        Raises:
+            gp.GPhoto2Error: Si la cámara no informa el archivo antes del timeout
+        """
+        deadline = time.monotonic() + timeout_seconds
+        with self._camera_lock:
+            while time.monotonic() < deadline:
+                event_type, event_data = self.camera.wait_for_event(2000, self.context)
+                self.logger.debug("Evento durante captura: %s", event_type)
+                if event_type == gp.GP_EVENT_FILE_ADDED:
+                    return event_data
+        raise gp.GPhoto2Error(gp.GP_ERROR_TIMEOUT)
+    
+    def wait_all_downloads(self) -> List[Optional[str]]:
+        """
+        Esperar a que terminen las descargas encoladas con wait=False.
+        
+        Returns:
+            List[str]: Rutas descargadas en orden de captura (None si hubo error)
+        """
+        pending, self._pending_downloads = self._pending_downloads, []
+        return [future.result() for future in pending]
+    
+    def _download_camera_file(self, folder: str, filename: str, local_path: str,
+                              delete_from_camera: bool) -> str:
+        """Descargar un archivo de la cámara a local_path (lanza GPhoto2Error si falla)"""
+        # libgphoto2 escribe directamente en nuestro descriptor, sin buffer intermedio
+        fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            camera_file = gp.CameraFile(fd)
+        except BaseException:
+            os.close(fd)
+            os.remove(local_path)
+            raise
+        
+        # Desde aquí el descriptor es de libgphoto2: lo cierra al liberar
+        # camera_file (no cerrarlo también acá, el número podría ser ya de otro archivo)
+        try:
+            with self._camera_lock:
+                self.logger.info(f"Descargando {folder}/{filename} -> {local_path}")
+                gp.check_result(gp.gp_camera_file_get(
+                    self.camera, folder, filename,
+                    gp.GP_FILE_TYPE_NORMAL, camera_file, self.context
+                ))
+        except BaseException:
+            del camera_file
+            # No dejar archivos a medio escribir
+            os.remove(local_path)
+            raise
+        # Liberar ya, para que el archivo quede cerrado antes de usarlo
+        del camera_file
+        
+        # Eliminar recién cuando la copia local está en disco
+        if delete_from_camera:
+            with self._camera_lock:
+                self.camera.file_delete(folder, filename, self.context)
+            self._folder_cache.pop(folder, None)
+            self.logger.info("Archivo eliminado de la cámara")
+        
+        return local_path
+    
+    def _clear_post_capture_events(self) -> None:
+        """Vaciar eventos después de la captura para limpiar el buffer"""
+        self._drain_events(max_wait_ms=200)
+    
+    def _drain_events(self, max_wait_ms: int = 1500) -> bool:
+        """
+        Consumir eventos pendientes de la cámara con esperas cortas, hasta que
+        no quede ninguno o se agote el tiempo.
+        
+        Args:
+            max_wait_ms (int): Tiempo máximo total de espera en milisegundos
+            
+        Returns:
+            bool: True si la cola de eventos quedó vacía, False si timeout
+        """
+        deadline = time.monotonic() + max_wait_ms / 1000
+        with self._camera_lock:
+            while time.monotonic() < deadline:
+                try:
+                    event_type, event_data = self.camera.wait_for_event(50, self.context)
+                except gp.GPhoto2Error as e:
+                    # No hay problema si no hay eventos
+                    self.logger.debug("No hay eventos pendientes: %s", e)
+                    return True
+                self.logger.debug("Evento recibido: %s", event_type)
+                if event_type in (gp.GP_EVENT_TIMEOUT, gp.GP_EVENT_CAPTURE_COMPLETE):
+                    return True
+        return False
+    
+    def list_files_on_camera(self, refresh: bool = False) -> List[FileInfo]:
         """
         Listar todos los archivos disponibles en la cámara.
         
+        Args:
+            refresh (bool): Si True, descarta el cache de carpetas y vuelve a
+                            consultar la cámara
+        
         Returns:
-            List[Dict]: Lista de archivos con información (folder, name, size, etc.)
+            List[FileInfo]: Lista de archivos con información (folder, name, size, mtime)
         """
         if not self.camera:
             self.logger.error("No hay conexión con la cámara.")
             return []
         
+        if refresh:
+            self._folder_cache.clear()
+        
         files = []
         try:
-            # Obtener lista de carpetas en la cámara
-            folder_list = self.camera.folder_list_folders('/', self.context)
-            
-            # Recorrer carpetas recursivamente
+            # Recorrer carpetas desde la raíz
             self._scan_folder('/', files)
             
             self.logger.info(f"Se encontraron {len(files)} archivos en la cámara")
@@ -469,31 +797,52 @@ class CaptureController:
             self.logger.error(f"Error al listar archivos: {e}")
             return []
     
-    def _scan_folder(self, folder_path: str, files_list: List[Dict[str, Any]]) -> None:
-        """Escanear una carpeta recursivamente para encontrar archivos"""
-        try:
+    def _scan_folder(self, folder_path: str, files_list: List[FileInfo]) -> None:
+        """Escanear una carpeta y sus subcarpetas para encontrar archivos"""
+        # Pila explícita en lugar de recursión
+        pending = deque([folder_path])
+        while pending:
+            current = pending.pop()
+            try:
+                cached = self._folder_cache.get(current)
+                if cached is None:
+                    cached = self._list_folder(current)
+                    self._folder_cache[current] = cached
+                folder_files, subfolders = cached
+                files_list.extend(folder_files)
+                
+                # Apilar en orden inverso para recorrer igual que la versión recursiva
+                prefix = current.rstrip('/')
+                for subfolder in reversed(subfolders):
+                    pending.append(f"{prefix}/{subfolder}")
+                    
+            except gp.GPhoto2Error as e:
+                self.logger.warning(f"No se pudo escanear carpeta {current}: {e}")
+    
+    def _list_folder(self, folder_path: str):
+        """
+        Consultar a la cámara los archivos y subcarpetas de una sola carpeta.
+        
+        Returns:
+            tuple: (List[FileInfo], List[str] con nombres de subcarpetas)
+        """
+        # Todas las consultas de una carpeta se hacen tomando el lock una sola vez
+        with self._camera_lock:
             # Listar archivos en la carpeta actual
             file_list = self.camera.folder_list_files(folder_path, self.context)
+            folder_files = []
             for i in range(file_list.count()):
-                filename = file_list.get_name(i)
-                file_info = self.camera.file_get_info(folder_path, filename, self.context)
-                
-                files_list.append({
-                    'folder': folder_path,
-                    'name': filename,
-                    'size': file_info.file.size,
-                    'mtime': file_info.file.mtime
-                })
-            
-            # Listar subcarpetas y escanear recursivamente
+                name = file_list.get_name(i)
+                file_info = self.camera.file_get_info(folder_path, name, self.context)
+                folder_files.append(FileInfo(
+                    folder_path, name, file_info.file.size, file_info.file.mtime
+                ))
+            
+            # Listar subcarpetas
             folder_list = self.camera.folder_list_folders(folder_path, self.context)
-            for i in range(folder_list.count()):
-                subfolder = folder_list.get_name(i)
-                subfolder_path = f"{folder_path.rstrip('/')}/{subfolder}"
-                self._scan_folder(subfolder_path, files_list)
-                
-        except gp.GPhoto2Error as e:
-            self.logger.warning(f"No se pudo escanear carpeta {folder_path}: {e}")
+            subfolders = [folder_list.get_name(i) for i in range(folder_list.count())]
+        
+        return folder_files, subfolders
     
     def download_file(self, folder: str, filename: str, 
                      local_filename: Optional[str] = None,
@@ -519,25 +868,14 @@ class CaptureController:
             if not local_filename:
                 local_filename = filename
             
-            local_path = self.download_folder / local_filename
-            
-            self.logger.info(f"Descargando {folder}/{filename} -> {local_path}")
+            local_path = self._download_prefix + local_filename
             
-            # Obtener archivo de la cámara
-            camera_file = self.camera.file_get(
-                folder, filename, gp.GP_FILE_TYPE_NORMAL, self.context
+            self._download_camera_file(
+                folder, filename, local_path, delete_from_camera
             )
             
-            # Guardar localmente
-            camera_file.save(str(local_path))
-            
-            # Eliminar de la cámara si se solicita
-            if delete_from_camera:
-                self.camera.file_delete(folder, filename, self.context)
-                self.logger.info("Archivo eliminado de la cámara")
-            
             self.logger.info(f"Archivo descargado: {local_path}")
-            return str(local_path)
+            return local_path
             
         except gp.GPhoto2Error as e:
             self.logger.error(f"Error al descargar archivo: {e}")
@@ -567,18 +905,22 @@ class CaptureController:
     def _config_to_dict(self, config) -> Dict[str, Any]:
         """Convertir configuración de gphoto2 a diccionario"""
         result = {}
-        for i in range(config.count_children()):
-            child = config.get_child(i)
-            name = child.get_name()
-            try:
-                value = child.get_value()
-                result[name] = value
-            except:
-                # Si no se puede obtener el valor, intentar recursivamente
-                if child.count_children() > 0:
-                    result[name] = self._config_to_dict(child)
-                else:
-                    result[name] = None
+        # Recorrido iterativo del árbol: (nodo, diccionario destino)
+        pending = deque([(config, result)])
+        while pending:
+            node, target = pending.popleft()
+            for i in range(node.count_children()):
+                child = node.get_child(i)
+                name = child.get_name()
+                try:
+                    target[name] = child.get_value()
+                except gp.GPhoto2Error:
+                    # Si no se puede obtener el valor, es una sección: recorrer sus hijos
+                    if child.count_children() > 0:
+                        target[name] = {}
+                        pending.append((child, target[name]))
+                    else:
+                        target[name] = None
         return result
     
     def __enter__(self):
@@ -604,29 +946,23 @@ def main():
     print("=== DIAGNÓSTICO DE CONEXIÓN ===")
     print("Ejecutando comandos de diagnóstico...")
     
-    # Intentar diagnóstico automático
-    import subprocess
-    
+    # Diagnóstico directo con libgphoto2 (sin lanzar el ejecutable gphoto2)
     try:
         print("\n1. Detectando cámaras disponibles:")
-        result = subprocess.run(['gphoto2', '--auto-detect'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.stdout:
-            print(result.stdout)
+        camera_list = _autodetect_cameras(gp.Context())
+        if camera_list:
+            for name, port in camera_list:
+                print(f"   {name:<30} {port}")
         else:
             print("   No se detectaron cámaras")
             
         print("\n2. Listando puertos USB:")
-        result = subprocess.run(['gphoto2', '--list-ports'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.stdout:
-            print(result.stdout)
-            
-    except subprocess.TimeoutExpired:
-        print("   Timeout - puede que la cámara no responda")
-    except FileNotFoundError:
-        print("   gphoto2 no está instalado en el sistema")
-    except Exception as e:
+        port_info_list = _get_port_info_list()
+        for i in range(port_info_list.count()):
+            port_info = port_info_list.get_info(i)
+            print(f"   {port_info.path:<30} {port_info.name}")
+            
+    except gp.GPhoto2Error as e:
         print(f"   Error ejecutando diagnóstico: {e}")
     
     print("\n=== INTENTANDO CONEXIÓN ===")
@@ -649,8 +985,8 @@ def main():
                 print("\n=== Archivos en la cámara ===")
                 files = camera.list_files_on_camera()
                 for file_info in files[:5]:  # Mostrar solo los primeros 5
-                    print(f"📁 {file_info['folder']}/{file_info['name']} "
-                          f"({file_info['size']} bytes)")
+                    print(f"📁 {file_info.folder}/{file_info.name} "
+                          f"({file_info.size} bytes)")
             
             print(f"\n=== Capturando nueva imagen ===")
             modo = "RAM de la cámara" if use_ram else "tarjeta SD"
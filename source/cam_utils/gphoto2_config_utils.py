@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 
 import logging
-from typing import Optional, Dict, Any, List, Union
+import math
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Mapping, Tuple, Union
 from pathlib import Path
 
 try:
@@ -15,6 +21,58 @@ except ImportError:
 # Importar la clase base
 from gphoto2_capture import Capture
 
+# Claves alternativas para escribir configuraciones comunes (solo lectura)
+_FLAT_SETTER_KEYS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'iso': ('iso', 'isospeed'),
+    'shutter_speed': ('shutterspeed', 'shutter'),
+    'aperture': ('aperture', 'fnumber'),
+    'white_balance': ('whitebalance', 'wb'),
+    'image_quality': ('imagequality', 'quality'),
+    'focus_mode': ('focusmode', 'autofocus'),
+})
+
+# Campos leídos de cada item de configuración: (clave del resultado, método, valor por defecto)
+_GETTERS: Tuple[Tuple[str, str, Any], ...] = (
+    ('current_value', 'get_value', None),
+    ('type', 'get_type', None),
+    ('label', 'get_label', ''),
+    ('info', 'get_info', ''),
+    ('readonly', 'get_readonly', False),
+)
+
+# Claves alternativas de las configuraciones comunes, en orden de preferencia
+_COMMON_ALIASES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('iso', ('iso', 'isospeed', 'sensitivity')),
+    ('shutter_speed', ('shutterspeed', 'shutter', 'speed')),
+    ('aperture', ('aperture', 'fnumber', 'f-number')),
+    ('white_balance', ('whitebalance', 'wb')),
+    ('image_quality', ('imagequality', 'quality')),
+    ('focus_mode', ('focusmode', 'autofocus', 'af')),
+)
+
+# Lista plana (configuración, alias) precalculada a partir de _COMMON_ALIASES
+_FLAT_ALIAS_LOOKUP: Tuple[Tuple[str, str], ...] = tuple(
+    (setting_name, alias)
+    for setting_name, aliases in _COMMON_ALIASES
+    for alias in aliases
+)
+
+
+def _values_match(widget_type, actual, requested) -> bool:
+    """
+    Comparar el valor leído de la cámara con el solicitado según el tipo de widget:
+    enteros y toggles como int, rangos como float con tolerancia, el resto como texto.
+    """
+    try:
+        if widget_type in (gp.GP_WIDGET_TOGGLE, gp.GP_WIDGET_INT):
+            return int(actual) == int(requested)
+        if widget_type == gp.GP_WIDGET_RANGE:
+            return math.isclose(float(actual), float(requested), rel_tol=1e-6)
+    except (TypeError, ValueError):
+        pass
+    # Radio, menú, texto: comparación directa; solo se convierte a str si difieren los tipos
+    return actual == requested or str(actual) == str(requested)
+
 
 class ConfigUtils(Capture):
     """
@@ -32,7 +90,24 @@ class ConfigUtils(Capture):
             camera_port (str): Puerto USB donde está conectada la cámara
             use_camera_ram (bool): Si True, captura directamente en RAM
         """
+        # Worker para escrituras asíncronas (se crea con la primera, ver
+        # set_config_value_async). Antes de super().__init__ porque disconnect lo usa
+        self._config_executor = None
+        self._executor_lock = threading.Lock()
+        
         super().__init__(download_folder, camera_port, use_camera_ram)
+        
+        # Índice (árbol, dict) del último árbol de configuración recorrido
+        self._config_index = None
+        
+        # Cache de lectura del árbol (instante, árbol) y de sus claves (árbol, claves)
+        self._config_cache = None
+        self._keys_cache = None
+        
+        # Acceso serializado a la cámara (reentrante: set_config_value lee
+        # a través de _get_config_cached)
+        self._cam_lock = threading.RLock()
+        
         self.logger.info("Canon T7 Extended Controller inicializado")
     
     def get_all_config_keys(self) -> List[str]:
@@ -47,10 +122,14 @@ class ConfigUtils(Capture):
             return []
         
         try:
-            config = self.camera.get_config(self.context)
+            config = self._get_config_cached()
+            if self._keys_cache is not None and self._keys_cache[0] is config:
+                return list(self._keys_cache[1])
             keys = self._extract_config_keys(config)
+            self._keys_cache = (config, keys)
             self.logger.info(f"Se encontraron {len(keys)} claves de configuración")
-            return keys
+            # Copia, como en el acierto: quien la modifique no toca el cache
+            return list(keys)
             
         except gp.GPhoto2Error as e:
             self.logger.error(f"Error al obtener claves de configuración: {e}")
@@ -58,7 +137,7 @@ class ConfigUtils(Capture):
     
     def _extract_config_keys(self, config, parent_path: str = "") -> List[str]:
         """
-        Extraer todas las claves de configuración recursivamente.
+        Extraer todas las claves de configuración del árbol.
         
         Args:
             config: Objeto de configuración de gphoto2
@@ -68,38 +147,65 @@ class ConfigUtils(Capture):
             List[str]: Lista de claves encontradas
         """
         keys = []
+        stack = [(config, parent_path)]
         
         try:
-            for i in range(config.count_children()):
-                child = config.get_child(i)
-                child_name = child.get_name()
-                
-                # Construir la ruta completa de la clave
-                if parent_path:
-                    full_key = f"{parent_path}.{child_name}"
-                else:
-                    full_key = child_name
-                
-                # Agregar la clave actual
-                keys.append(full_key)
+            # Recorrido en profundidad con pila explícita; los hijos se apilan
+            # en orden inverso para conservar el orden del árbol
+            while stack:
+                node, node_path = stack.pop()
+                if node is not config:
+                    keys.append(node_path)
                 
-                # Si tiene hijos, extraer recursivamente
-                if child.count_children() > 0:
-                    child_keys = self._extract_config_keys(child, full_key)
-                    keys.extend(child_keys)
+                # Métodos del widget en variables locales
+                get_child = node.get_child
+                child_count = node.count_children()
+                for i in range(child_count - 1, -1, -1):
+                    child = get_child(i)
+                    child_name = child.get_name()
+                    
+                    # Construir la ruta completa de la clave
+                    if node_path:
+                        full_key = f"{node_path}.{child_name}"
+                    else:
+                        full_key = child_name
+                    
+                    stack.append((child, full_key))
                     
         except Exception as e:
             self.logger.debug(f"Error extrayendo claves de {parent_path}: {e}")
         
         return keys
     
-    def get_config_value(self, config_key: str) -> Optional[Dict[str, Any]]:
+    def _get_config_cached(self, ttl: float = 2.0):
+        """
+        Obtener el árbol de configuración, reutilizando la última lectura
+        si tiene menos de ttl segundos. Solo para lecturas: las escrituras
+        deben partir de un árbol nuevo de camera.get_config().
+        """
+        with self._cam_lock:
+            now = time.monotonic()
+            if self._config_cache is not None and now - self._config_cache[0] < ttl:
+                return self._config_cache[1]
+            
+            config = self.camera.get_config(self.context)
+            self._config_cache = (now, config)
+            return config
+    
+    def _invalidate_config_cache(self) -> None:
+        """Descartar el árbol y las claves en cache tras modificar la cámara"""
+        self._config_cache = None
+        self._keys_cache = None
+    
+    def get_config_value(self, config_key: str, config=None) -> Optional[Dict[str, Any]]:
         """
         Obtener el valor y metadatos de una entrada de configuración específica.
         
         Args:
             config_key (str): Clave de configuración (ej: 'iso', 'shutterspeed', 'aperture')
                              Puede usar notación de punto para claves anidadas (ej: 'image.quality')
+            config: Árbol de configuración ya obtenido de la cámara (opcional).
+                    Si se pasa, no se vuelve a consultar la cámara.
         
         Returns:
             Dict[str, Any]: Diccionario con información de la configuración:
@@ -117,58 +223,14 @@ class ConfigUtils(Capture):
             return None
         
         try:
-            config = self.camera.get_config(self.context)
-            config_item = self._find_config_item(config, config_key)
+            if config is None:
+                config = self._get_config_cached()
+            result = self._get_config_value_from(config, config_key)
             
-            if not config_item:
+            if not result:
                 self.logger.warning(f"Clave de configuración '{config_key}' no encontrada")
                 return None
             
-            # Obtener información del item de configuración
-            result = {
-                'key': config_key,
-                'current_value': None,
-                'choices': [],
-                'type': None,
-                'readonly': False,
-                'label': '',
-                'info': ''
-            }
-            
-            try:
-                result['current_value'] = config_item.get_value()
-            except:
-                result['current_value'] = None
-            
-            try:
-                result['type'] = config_item.get_type()
-            except:
-                pass
-            
-            try:
-                result['label'] = config_item.get_label()
-            except:
-                pass
-            
-            try:
-                result['info'] = config_item.get_info()
-            except:
-                pass
-            
-            try:
-                result['readonly'] = config_item.get_readonly()
-            except:
-                pass
-            
-            # Obtener opciones disponibles si es un tipo choice
-            try:
-                choice_count = config_item.count_choices()
-                for i in range(choice_count):
-                    choice = config_item.get_choice(i)
-                    result['choices'].append(choice)
-            except:
-                pass  # No todos los items tienen choices
-            
             self.logger.info(f"Configuración '{config_key}': {result['current_value']}")
             return result
             
@@ -176,7 +238,43 @@ class ConfigUtils(Capture):
             self.logger.error(f"Error al obtener configuración '{config_key}': {e}")
             return None
     
-    def set_config_value(self, config_key: str, value: Union[str, int, float, Dict[str, Any]]) -> bool:
+    def _get_config_value_from(self, config, config_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Leer valor y metadatos de una clave desde un árbol de configuración ya obtenido.
+        No consulta la cámara.
+        
+        Returns:
+            Dict[str, Any]: Ver get_config_value(), o None si la clave no existe
+        """
+        config_item = self._find_config_item(config, config_key)
+        
+        if not config_item:
+            return None
+        
+        return self._describe_config_item(config_item, config_key)
+    
+    def _describe_config_item(self, config_item, config_key: str) -> Dict[str, Any]:
+        """Armar el diccionario de valor y metadatos de un item ya localizado"""
+        # Obtener información del item de configuración
+        result = {'key': config_key, 'choices': []}
+        
+        for result_key, method_name, default in _GETTERS:
+            try:
+                result[result_key] = getattr(config_item, method_name)()
+            except Exception:
+                result[result_key] = default
+        
+        # Obtener opciones disponibles si es un tipo choice
+        try:
+            get_choice = config_item.get_choice
+            result['choices'] = [get_choice(i) for i in range(config_item.count_choices())]
+        except Exception:
+            pass  # No todos los items tienen choices
+        
+        return result
+    
+    def set_config_value(self, config_key: str, value: Union[str, int, float, Dict[str, Any]],
+                         verify: bool = True) -> bool:
         """
         Modificar el valor de una entrada de configuración.
         
@@ -185,78 +283,204 @@ class ConfigUtils(Capture):
             value: Nuevo valor a establecer. Puede ser:
                   - str/int/float: Valor directo
                   - Dict: Para configuraciones complejas con múltiples parámetros
+            verify (bool): Si True, releer la configuración para comprobar el valor
+                           aplicado (una transferencia USB adicional)
         
         Returns:
             bool: True si la configuración se aplicó exitosamente, False en caso contrario
         """
-        if not self.camera:
-            self.logger.error("No hay conexión con la cámara.")
+        # Serializar con set_config_value_async y otras lecturas/escrituras
+        with self._cam_lock:
+            if not self.camera:
+                self.logger.error("No hay conexión con la cámara.")
+                return False
+            
+            try:
+                config = self.camera.get_config(self.context)
+                if not self._set_item_value(config, config_key, value):
+                    return False
+                
+                # Aplicar configuración a la cámara
+                self.camera.set_config(config, self.context)
+                self._invalidate_config_cache()
+                
+                if not verify:
+                    return True
+                
+                # Verificar que el cambio se aplicó (la lectura queda en cache)
+                new_config = self._get_config_cached()
+                self._log_applied_value(new_config, config_key, value)
+                return True
+                
+            except gp.GPhoto2Error as e:
+                self.logger.error(f"Error al establecer configuración '{config_key}': {e}")
+                return False
+            except Exception as e:
+                self.logger.error(f"Error inesperado al configurar '{config_key}': {e}")
+                return False
+    
+    def set_config_value_async(self, config_key: str,
+                               value: Union[str, int, float, Dict[str, Any]]) -> Future:
+        """
+        Versión asíncrona de set_config_value(): la escritura y la verificación
+        se hacen en un hilo secundario y el llamador no se bloquea.
+        
+        Returns:
+            Future[bool]: Se completa con el resultado de set_config_value()
+        """
+        with self._executor_lock:
+            if self._config_executor is None:
+                self._config_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ConfigWriter")
+            return self._config_executor.submit(self.set_config_value, config_key, value)
+    
+    def _shutdown_config_executor(self) -> None:
+        """Esperar las escrituras asíncronas pendientes y terminar el worker"""
+        # Se espera fuera del lock: el worker no lo necesita para terminar
+        with self._executor_lock:
+            executor, self._config_executor = self._config_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def disconnect(self) -> None:
+        """Desconectar de la cámara, después de terminar las escrituras asíncronas pendientes"""
+        self._shutdown_config_executor()
+        super().disconnect()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Esperar las escrituras asíncronas pendientes antes de cerrar la cámara"""
+        self._shutdown_config_executor()
+        return super().__exit__(exc_type, exc_val, exc_tb)
+    
+    def _set_item_value(self, config, config_key: str,
+                        value: Union[str, int, float, Dict[str, Any]]) -> bool:
+        """
+        Modificar el valor de una clave en un árbol de configuración ya obtenido.
+        El cambio no se envía a la cámara hasta llamar a camera.set_config().
+        
+        Returns:
+            bool: True si el valor se estableció en el árbol, False en caso contrario
+        """
+        config_item = self._find_config_item(config, config_key)
+        
+        if not config_item:
+            self.logger.error(f"Clave de configuración '{config_key}' no encontrada")
             return False
         
+        # Verificar si es de solo lectura
         try:
-            config = self.camera.get_config(self.context)
-            config_item = self._find_config_item(config, config_key)
-            
-            if not config_item:
-                self.logger.error(f"Clave de configuración '{config_key}' no encontrada")
+            if config_item.get_readonly():
+                self.logger.error(f"La configuración '{config_key}' es de solo lectura")
                 return False
-            
-            # Verificar si es de solo lectura
+        except:
+            pass  # Si no se puede verificar, intentar continuar
+        
+        # Obtener valor actual para log
+        try:
+            current_value = config_item.get_value()
+            self.logger.info(f"Cambiando '{config_key}' de '{current_value}' a '{value}'")
+        except:
+            self.logger.info(f"Estableciendo '{config_key}' a '{value}'")
+        
+        # Establecer nuevo valor
+        if isinstance(value, dict):
+            # Para configuraciones complejas, intentar establecer sub-valores
+            get_child_by_name = config_item.get_child_by_name
+            for sub_key, sub_value in value.items():
+                try:
+                    sub_config = get_child_by_name(sub_key)
+                    sub_config.set_value(sub_value)
+                    self.logger.debug(f"Sub-configuración '{sub_key}' establecida a '{sub_value}'")
+                except Exception as e:
+                    self.logger.warning(f"No se pudo establecer sub-configuración '{sub_key}': {e}")
+        else:
+            # Valor simple
             try:
-                if config_item.get_readonly():
-                    self.logger.error(f"La configuración '{config_key}' es de solo lectura")
-                    return False
-            except:
-                pass  # Si no se puede verificar, intentar continuar
-            
-            # Obtener valor actual para log
+                config_item.set_value(value)
+            except gp.GPhoto2Error as e:
+                self.logger.error(f"Valor '{value}' no válido para '{config_key}': {e}")
+                return False
+        
+        return True
+    
+    def _log_applied_value(self, new_config, config_key: str, value) -> None:
+        """Registrar si el valor leído de la cámara coincide con el solicitado"""
+        new_config_item = self._find_config_item(new_config, config_key)
+        if new_config_item:
             try:
-                current_value = config_item.get_value()
-                self.logger.info(f"Cambiando '{config_key}' de '{current_value}' a '{value}'")
+                actual_value = new_config_item.get_value()
+                if isinstance(value, dict):
+                    matches = bool(actual_value)
+                else:
+                    matches = _values_match(new_config_item.get_type(), actual_value, value)
+                if matches:
+                    self.logger.info(f"✅ Configuración '{config_key}' aplicada exitosamente: {actual_value}")
+                else:
+                    # Aún consideramos exitoso, la cámara puede haber ajustado el valor
+                    self.logger.warning(f"⚠️ Valor aplicado ({actual_value}) difiere del solicitado ({value})")
             except:
-                self.logger.info(f"Estableciendo '{config_key}' a '{value}'")
-            
-            # Establecer nuevo valor
-            if isinstance(value, dict):
-                # Para configuraciones complejas, intentar establecer sub-valores
-                for sub_key, sub_value in value.items():
-                    try:
-                        sub_config = config_item.get_child_by_name(sub_key)
-                        sub_config.set_value(sub_value)
-                        self.logger.debug(f"Sub-configuración '{sub_key}' establecida a '{sub_value}'")
-                    except Exception as e:
-                        self.logger.warning(f"No se pudo establecer sub-configuración '{sub_key}': {e}")
-            else:
-                # Valor simple
-                config_item.set_value(value)
-            
-            # Aplicar configuración a la cámara
-            self.camera.set_config(config, self.context)
-            
-            # Verificar que el cambio se aplicó
-            new_config = self.camera.get_config(self.context)
-            new_config_item = self._find_config_item(new_config, config_key)
-            if new_config_item:
-                try:
-                    actual_value = new_config_item.get_value()
-                    if str(actual_value) == str(value) or (isinstance(value, dict) and actual_value):
-                        self.logger.info(f"✅ Configuración '{config_key}' aplicada exitosamente: {actual_value}")
-                        return True
-                    else:
-                        self.logger.warning(f"⚠️ Valor aplicado ({actual_value}) difiere del solicitado ({value})")
-                        return True  # Aún consideramos exitoso, la cámara puede haber ajustado el valor
-                except:
-                    self.logger.info(f"✅ Configuración '{config_key}' aplicada (verificación no disponible)")
-                    return True
-            
-            return True
+                self.logger.info(f"✅ Configuración '{config_key}' aplicada (verificación no disponible)")
+    
+    def _build_config_index(self, config) -> Dict[str, Any]:
+        """
+        Recorrer el árbol de configuración una sola vez y construir un índice.
+        
+        Args:
+            config: Objeto de configuración base
             
-        except gp.GPhoto2Error as e:
-            self.logger.error(f"Error al establecer configuración '{config_key}': {e}")
-            return False
+        Returns:
+            Dict con:
+                - 'paths': {ruta completa en minúsculas: widget}
+                - 'names': {nombre de hoja en minúsculas: widget} (primer match)
+                - 'partial': Lista de (nombre en minúsculas, nombre, widget) para match parcial
+                - 'entries': Lista de (ruta en minúsculas, ruta original, widget)
+                - 'children': {ruta del padre en minúsculas: [(nombre en minúsculas, nombre, widget)]}
+            Cada nombre se obtiene y se pasa a minúsculas una sola vez por widget.
+        """
+        paths = {}
+        names = {}
+        partial = []
+        add_partial = partial.append
+        add_name = names.setdefault
+        entries = []
+        add_entry = entries.append
+        children = {}
+        stack = [(config, "", "")]
+        
+        try:
+            while stack:
+                node, parent_path, parent_original = stack.pop()
+                # Métodos del widget en variables locales
+                get_child = node.get_child
+                siblings = children[parent_path] = []
+                add_sibling = siblings.append
+                for i in range(node.count_children()):
+                    child = get_child(i)
+                    name = child.get_name()
+                    lowered = name.lower()
+                    full_path = f"{parent_path}.{lowered}" if parent_path else lowered
+                    full_original = f"{parent_original}.{name}" if parent_original else name
+                    
+                    paths[full_path] = child
+                    add_name(lowered, child)
+                    add_partial((lowered, name, child))
+                    add_sibling((lowered, name, child))
+                    add_entry((full_path, full_original, child))
+                    
+                    if child.count_children() > 0:
+                        stack.append((child, full_path, full_original))
         except Exception as e:
-            self.logger.error(f"Error inesperado al configurar '{config_key}': {e}")
-            return False
+            self.logger.debug(f"Error indexando configuración: {e}")
+        
+        return {'paths': paths, 'names': names, 'partial': partial,
+                'entries': entries, 'children': children}
+    
+    def _get_config_index(self, config) -> Dict[str, Any]:
+        """Obtener el índice del árbol, reutilizándolo si es el mismo objeto"""
+        if self._config_index is not None and self._config_index[0] is config:
+            return self._config_index[1]
+        index = self._build_config_index(config)
+        self._config_index = (config, index)
+        return index
     
     def _find_config_item(self, config, config_key: str):
         """
@@ -269,41 +493,49 @@ class ConfigUtils(Capture):
         Returns:
             Objeto de configuración encontrado o None
         """
-        # Dividir la clave si tiene notación de punto
-        key_parts = config_key.split('.')
-        current_config = config
+        index = self._get_config_index(config)
+        key = config_key.lower()
         
-        try:
-            for part in key_parts:
-                # Buscar en los hijos del config actual
-                found = False
-                for i in range(current_config.count_children()):
-                    child = current_config.get_child(i)
-                    if child.get_name().lower() == part.lower():
-                        current_config = child
-                        found = True
-                        break
-                
-                if not found:
-                    # Intentar búsqueda case-insensitive más exhaustiva
-                    for i in range(current_config.count_children()):
-                        child = current_config.get_child(i)
-                        child_name = child.get_name()
-                        if (part.lower() in child_name.lower() or 
-                            child_name.lower() in part.lower()):
-                            current_config = child
-                            found = True
-                            self.logger.debug(f"Encontrado match parcial: '{part}' -> '{child_name}'")
-                            break
-                
-                if not found:
-                    return None
-            
-            return current_config
-            
-        except Exception as e:
-            self.logger.debug(f"Error buscando configuración '{config_key}': {e}")
-            return None
+        # Ruta completa o nombre de hoja exactos
+        config_item = index['paths'].get(key) or index['names'].get(key)
+        if config_item is not None:
+            return config_item
+        
+        # Recorrer la ruta nivel por nivel: una sola pasada por nivel que
+        # prefiere el match exacto y recuerda el primer match parcial
+        children = index['children']
+        parent_path = ""
+        current = None
+        for part in key.split('.'):
+            exact = None
+            partial = None
+            for lowered, name, child in children.get(parent_path, ()):
+                if lowered == part:
+                    exact = (lowered, child)
+                    break
+                if partial is None and (part in lowered or lowered in part):
+                    partial = (lowered, child)
+            
+            match = exact or partial
+            if match is None:
+                current = None
+                break
+            if exact is None:
+                self.logger.debug(f"Encontrado match parcial: '{part}' -> '{match[0]}'")
+            parent_path = f"{parent_path}.{match[0]}" if parent_path else match[0]
+            current = match[1]
+        
+        if current is not None:
+            return current
+        
+        # Intentar búsqueda case-insensitive más exhaustiva sobre el último tramo
+        part = key.rsplit('.', 1)[-1]
+        for lowered, name, child in index['partial']:
+            if part in lowered or lowered in part:
+                self.logger.debug(f"Encontrado match parcial: '{config_key}' -> '{name}'")
+                return child
+        
+        return None
     
     def get_common_settings(self) -> Dict[str, Any]:
         """
@@ -318,26 +550,23 @@ class ConfigUtils(Capture):
                 - 'image_quality': Calidad de imagen
                 - 'focus_mode': Modo de enfoque
         """
-        common_keys = {
-            'iso': ['iso', 'isospeed', 'sensitivity'],
-            'shutter_speed': ['shutterspeed', 'shutter', 'speed'],
-            'aperture': ['aperture', 'fnumber', 'f-number'],
-            'white_balance': ['whitebalance', 'wb'],
-            'image_quality': ['imagequality', 'quality'],
-            'focus_mode': ['focusmode', 'autofocus', 'af']
-        }
-        
-        result = {}
-        
-        for setting_name, possible_keys in common_keys.items():
-            for key in possible_keys:
-                config_info = self.get_config_value(key)
-                if config_info:
-                    result[setting_name] = config_info
-                    break
-            
-            if setting_name not in result:
-                result[setting_name] = None
+        result = {setting_name: None for setting_name, _ in _COMMON_ALIASES}
+        
+        if not self.camera:
+            self.logger.error("No hay conexión con la cámara.")
+            return result
+        
+        # Una sola consulta del árbol para todas las claves candidatas
+        try:
+            config = self._get_config_cached()
+        except gp.GPhoto2Error as e:
+            self.logger.error(f"Error al obtener configuración: {e}")
+            return result
+        
+        # Los alias están en orden de preferencia: gana el primero encontrado
+        for setting_name, key in _FLAT_ALIAS_LOOKUP:
+            if result[setting_name] is None:
+                result[setting_name] = self._get_config_value_from(config, key)
         
         return result
     
@@ -356,129 +585,125 @@ class ConfigUtils(Capture):
         Returns:
             Dict[str, bool]: Resultado de cada configuración aplicada
         """
-        common_key_mapping = {
-            'iso': ['iso', 'isospeed'],
-            'shutter_speed': ['shutterspeed', 'shutter'],
-            'aperture': ['aperture', 'fnumber'],
-            'white_balance': ['whitebalance', 'wb'],
-            'image_quality': ['imagequality', 'quality'],
-            'focus_mode': ['focusmode', 'autofocus']
-        }
-        
-        results = {}
-        
-        for setting_name, value in settings.items():
-            if setting_name in common_key_mapping:
-                success = False
-                for key in common_key_mapping[setting_name]:
-                    if self.set_config_value(key, value):
-                        success = True
-                        break
-                results[setting_name] = success
-            else:
-                # Intentar establecer directamente si no está en el mapeo
-                results[setting_name] = self.set_config_value(setting_name, value)
-        
-        return results
+        # Si no está en el mapeo, intentar establecer directamente
+        pairs = [(_FLAT_SETTER_KEYS.get(name, (name,)), value) for name, value in settings.items()]
+        outcomes = self._apply_settings_batch(pairs)
+        
+        return dict(zip(settings, outcomes))
+    
+    def _apply_settings_batch(self, pairs: List[Tuple[Union[str, Tuple[str, ...]], Any]],
+                              verify: bool = True) -> List[bool]:
+        """
+        Aplicar varias configuraciones con una sola lectura, una sola escritura
+        y una sola verificación del árbol de configuración.
+        
+        Args:
+            pairs: Lista de (clave, valor). La clave puede ser una tupla de
+                   claves alternativas; se usa la primera que se pueda establecer.
+            verify (bool): Si True, releer el árbol una vez al final para comprobar
+                           los valores aplicados
+        
+        Returns:
+            List[bool]: Resultado de cada par, en el mismo orden
+        """
+        with self._cam_lock:
+            outcomes = [False] * len(pairs)
+            
+            if not self.camera:
+                self.logger.error("No hay conexión con la cámara.")
+                return outcomes
+            
+            try:
+                # Modificar todos los valores sobre un único árbol de configuración
+                config = self.camera.get_config(self.context)
+                applied = []
+                
+                for position, (keys, value) in enumerate(pairs):
+                    if isinstance(keys, str):
+                        keys = (keys,)
+                    for key in keys:
+                        if self._set_item_value(config, key, value):
+                            applied.append((position, key, value))
+                            break
+                
+                if not applied:
+                    return outcomes
+                
+                # Un solo envío a la cámara y, opcionalmente, una sola verificación
+                self.camera.set_config(config, self.context)
+                self._invalidate_config_cache()
+                
+                for position, _, _ in applied:
+                    outcomes[position] = True
+                
+                if verify:
+                    new_config = self._get_config_cached()
+                    for _, key, value in applied:
+                        self._log_applied_value(new_config, key, value)
+                
+            except gp.GPhoto2Error as e:
+                self.logger.error(f"Error al establecer configuraciones: {e}")
+            
+            return outcomes
     
-    def print_all_configurations(self, filter_pattern: Optional[str] = None) -> None:
+    def print_all_configurations(self, filter_pattern: Optional[Union[str, Tuple[str, ...]]] = None) -> None:
         """
         Imprimir todas las configuraciones disponibles de forma organizada.
         
         Args:
-            filter_pattern (str, optional): Patrón para filtrar configuraciones
-                                          (ej: 'iso', 'focus', 'image')
+            filter_pattern (str o tuple, optional): Patrón para filtrar configuraciones
+                                          (ej: 'iso', 'focus', 'image'). Con una tupla
+                                          se muestran las que coincidan con cualquiera
         """
-        print("\n" + "="*60)
-        print("CONFIGURACIONES DE CÁMARA CANON T7")
-        print("="*60)
+        if not self.camera:
+            self.logger.error("No hay conexión con la cámara.")
+            return
+        
+        # Obtener el árbol una sola vez para todas las claves
+        try:
+            config = self._get_config_cached()
+        except gp.GPhoto2Error as e:
+            self.logger.error(f"Error al obtener configuración: {e}")
+            return
+        
+        # Rutas ya pasadas a minúsculas en el índice del árbol
+        entries = self._get_config_index(config)['entries']
         
-        keys = self.get_all_config_keys()
+        # Armar toda la salida en memoria y escribirla de una vez
+        buf: List[str] = []
+        append = buf.append
+        
+        append("\n" + "="*60)
+        append("CONFIGURACIONES DE CÁMARA CANON T7")
+        append("="*60)
         
         if filter_pattern:
-            keys = [key for key in keys if filter_pattern.lower() in key.lower()]
-            print(f"Filtrado por: '{filter_pattern}' ({len(keys)} resultados)")
-            print("-"*60)
+            if isinstance(filter_pattern, str):
+                filter_pattern = (filter_pattern,)
+            patterns = tuple(pattern.lower() for pattern in filter_pattern)
+            entries = [entry for entry in entries
+                       if any(pattern in entry[0] for pattern in patterns)]
+            append(f"Filtrado por: {', '.join(map(repr, filter_pattern))} ({len(entries)} resultados)")
+            append("-"*60)
         
-        for key in sorted(keys):
-            config_info = self.get_config_value(key)
+        for _, key, config_item in sorted(entries, key=lambda entry: entry[1]):
+            config_info = self._describe_config_item(config_item, key)
             if config_info:
-                print(f"\n📷 {key}")
-                print(f"   Valor actual: {config_info['current_value']}")
-                print(f"   Etiqueta: {config_info['label']}")
-                print(f"   Solo lectura: {'Sí' if config_info['readonly'] else 'No'}")
+                append(f"\n📷 {key}")
+                append(f"   Valor actual: {config_info['current_value']}")
+                append(f"   Etiqueta: {config_info['label']}")
+                append(f"   Solo lectura: {'Sí' if config_info['readonly'] else 'No'}")
                 
                 if config_info['choices']:
                     choices_str = ', '.join(map(str, config_info['choices'][:10]))
                     if len(config_info['choices']) > 10:
                         choices_str += f" ... (+{len(config_info['choices']) - 10} más)"
-                    print(f"   Opciones: {choices_str}")
+                    append(f"   Opciones: {choices_str}")
                 
                 if config_info['info']:
-                    print(f"   Info: {config_info['info']}")
+                    append(f"   Info: {config_info['info']}")
         
-        print(f"\n📊 Total de configuraciones: {len(keys)}")
-        print("="*60)
-
-
-# ===============================================
-# EJEMPLO DE USO DE LA CLASE EXTENDIDA
-# ===============================================
-
-def example_usage():
-    """Ejemplo de uso del controlador extendido"""
-    download_folder = "./captured_images"
-    
-    try:
-        with ConfigUtils(download_folder, use_camera_ram=True) as camera:
-            print("=== EXPLORANDO CONFIGURACIONES ===")
-            
-            # Obtener todas las claves disponibles
-            all_keys = camera.get_all_config_keys()
-            print(f"Total de configuraciones disponibles: {len(all_keys)}")
-            
-            # Mostrar algunas configuraciones comunes
-            print("\n=== CONFIGURACIONES COMUNES ===")
-            common = camera.get_common_settings()
-            for name, config in common.items():
-                if config:
-                    print(f"{name}: {config['current_value']} "
-                          f"(opciones: {len(config['choices'])})")
-                else:
-                    print(f"{name}: No disponible")
-            
-            # Ejemplo: Obtener configuración específica
-            print("\n=== CONFIGURACIÓN ESPECÍFICA (ISO) ===")
-            iso_config = camera.get_config_value('iso')
-            if iso_config:
-                print(f"ISO actual: {iso_config['current_value']}")
-                print(f"Opciones ISO disponibles: {iso_config['choices']}")
-            
-            # Ejemplo: Modificar configuración
-            print("\n=== MODIFICANDO CONFIGURACIONES ===")
-            changes = {
-                'iso': '400',
-                'image_quality': 'Fine'
-            }
-            
-            results = camera.set_common_settings(changes)
-            for setting, success in results.items():
-                status = "✅ Exitoso" if success else "❌ Error"
-                print(f"{setting}: {status}")
-            
-            # Mostrar configuraciones filtradas
-            print("\n=== CONFIGURACIONES RELACIONADAS CON ISO ===")
-            camera.print_all_configurations('iso')
-            
-            # Capturar imagen con nueva configuración
-            print("\n=== CAPTURANDO IMAGEN ===")
-            captured = camera.capture_and_download("imagen_configurada.jpg")
-            if captured:
-                print(f"✅ Imagen capturada: {captured}")
-            
-    except Exception as e:
-        print(f"❌ Error: {e}")
-
-
-if __name__ == "__main__":
-    example_usage()
+        append(f"\n📊 Total de configuraciones: {len(entries)}")
+        append("="*60)
+        
+        sys.stdout.write('\n'.join(buf) + '\n')
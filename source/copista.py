@@ -1,19 +1,26 @@
 #!/usr/bin/env python3
 
+import functools
 import json
+import logging
 import os
+from types import MappingProxyType
+from typing import Mapping
 
 from gui.digitization_dialog import launch_digitization_app_dialog
 # from cli_utils import CopistaCli
 
 class Copista:
-    def __init__(self, settings):
+    def __init__(self, settings: Mapping[str, str]):
         self.settings = settings
 
     def launch_gui(self):
         launch_digitization_app_dialog(self.settings)
     
-def load_settings():
+@functools.lru_cache(maxsize=1)
+def load_settings() -> Mapping[str, str]:
+    # se calcula una sola vez; se devuelve de solo lectura porque
+    # todas las llamadas comparten el mismo objeto
     # declara dict con valores por defecto
     default_settings = {
         'copista_folder' : '../config/',
@@ -23,9 +30,11 @@ def load_settings():
     # cargar algun archivo de configuracion maestro si hace falta con
     # valores que sean generales a todas las utilidades de copista   
     settings = default_settings
-    return settings
+    return MappingProxyType(settings)
 
 def main():
+    # Solo advertencias y errores; los mensajes de depuración no se formatean
+    logging.basicConfig(level=logging.WARNING)
     app = Copista(load_settings())
     app.launch_gui()
 
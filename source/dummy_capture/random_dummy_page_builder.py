@@ -2,6 +2,7 @@
 
 from reportlab.pdfgen import canvas
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, NextPageTemplate, KeepInFrame
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.styles import getSampleStyleSheet
@@ -11,54 +12,163 @@ from reportlab.lib.pagesizes import A5
 from reportlab.lib.units import inch
 from pdf2image import convert_from_path
 
+# PyMuPDF rasteriza el PDF en el mismo proceso (sin lanzar pdftoppm);
+# si no está instalado se usa pdf2image/Poppler
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
 from PIL import Image as PILImage
-from PIL import ImageDraw, ImageEnhance, ImageFilter
+import numpy as np
+import logging
 import random
 import os
 import math
 import subprocess
+import multiprocessing
+import threading
+from functools import partial
+import tempfile
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def generate_geometric_pattern(width=200, height=150, filename="/tmp/dummy.jpg"):
-    """Genera imagen con formas geométricas aleatorias"""
-    img = PILImage.new('RGB', (width, height), color=(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
-    draw = ImageDraw.Draw(img)
+log = logging.getLogger(__name__)
+
+_MODULE_FOLDER = os.path.dirname(os.path.abspath(__file__))
+_SCRIPT_PATH = os.fspath(Path(_MODULE_FOLDER) / "vintage2.sh")
+
+def register_fonts():
+    """Registra las fuentes TrueType una sola vez (se llama al importar el módulo)"""
+    if 'Georgia' in pdfmetrics.getRegisteredFontNames():
+        return
+    try:
+        pdfmetrics.registerFont(TTFont('Georgia', os.path.join(_MODULE_FOLDER, 'Georgia.ttf')))
+        pdfmetrics.registerFont(TTFont('Georgia-Bold', os.path.join(_MODULE_FOLDER, 'Georgia_Bold.ttf')))
+        pdfmetrics.registerFont(TTFont('Georgia-Italic', os.path.join(_MODULE_FOLDER, 'Georgia_Italic.ttf')))
+        pdfmetrics.registerFont(TTFont('Georgia-BoldItalic', os.path.join(_MODULE_FOLDER, 'Georgia_Bold_Italic.ttf')))
+    except Exception as e:
+        # Los estilos de las páginas usan Georgia: sin ella fallará la construcción del PDF
+        log.warning("No se pudieron registrar las fuentes Georgia (las páginas dummy no se podrán generar): %s", e)
+
+register_fonts()
+
+def box_blur(arr, radius):
+    """
+    Box blur separable sobre un arreglo entero (alto, ancho, canales), con los
+    bordes extendidos como ImageFilter.BoxBlur. Usa sumas acumuladas, así el
+    costo no depende del radio.
+    """
+    size = 2*radius + 1
+    for axis in (0, 1):
+        pad = [(0, 0)] * arr.ndim
+        pad[axis] = (radius + 1, radius)
+        sums = np.cumsum(np.pad(arr, pad, mode='edge'), axis=axis, dtype=np.int32)
+        sums = np.moveaxis(sums, axis, 0)
+        arr = np.moveaxis((sums[size:] - sums[:-size]) // size, 0, axis)
+    return arr
+
+# Estilos de las páginas dummy, creados una sola vez. Se derivan (parent=)
+# de la hoja de ejemplo en lugar de modificarla, así no se comparte estado mutable
+_STYLES = getSampleStyleSheet()
+_PARA_STYLE = ParagraphStyle('DummyBody', parent=_STYLES['Normal'], alignment=TA_JUSTIFY, fontName='Georgia')
+_TITLE_STYLE = ParagraphStyle('DummyTitle', parent=_STYLES['Heading1'])
+
+def generate_geometric_pattern(width=200, height=150):
+    """
+    Genera imagen con formas geométricas aleatorias.
+    Devuelve el JPEG en memoria (BytesIO), listo para platypus.Image.
+    """
+    # Generador propio por llamada: se siembra desde el SO, así cada proceso
+    # de get_dummy_capture obtiene patrones distintos
+    rng = np.random.default_rng()
+    
+    # Rasterizar las formas con NumPy sobre un arreglo (alto, ancho, RGB)
+    arr = np.empty((height, width, 3), dtype=np.uint8)
+    arr[:] = rng.integers(0, 256, 3)
+    ys, xs = np.ogrid[:height, :width]
     
-    # Dibujar círculos aleatorios
-    for _ in range(random.randint(3, 10)):
-        x = random.randint(0, width)
-        y = random.randint(0, height)
-        radius = random.randint(10, 80)
-        color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
-        draw.ellipse([x-radius, y-radius, x+radius, y+radius], fill=color)
+    # Dibujar círculos aleatorios (todos los parámetros sorteados de una vez)
+    n_circles = rng.integers(3, 11)
+    cx = rng.integers(0, width + 1, n_circles)
+    cy = rng.integers(0, height + 1, n_circles)
+    radii = rng.integers(10, 81, n_circles)
+    colors = rng.integers(0, 256, (n_circles, 3))
+    for x, y, radius, color in zip(cx, cy, radii, colors):
+        arr[(xs - x)**2 + (ys - y)**2 <= radius**2] = color
     
     # Dibujar rectángulos aleatorios
-    for _ in range(random.randint(2, 8)):
-        w = random.randint(0, math.floor(width*0.7))
-        h = random.randint(0, math.floor(height*0.75))
-        x1 = random.randint(0, width-1)
-        y1 = random.randint(0, height-1) 
-        x2 = min(math.floor(x1 + w), width)
-        y2 = min(math.floor(y1 + h), height)
-        color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
-        draw.rectangle([x1, y1, x2, y2], fill=color)
+    n_rects = rng.integers(2, 9)
+    ws = rng.integers(0, math.floor(width*0.7) + 1, n_rects)
+    hs = rng.integers(0, math.floor(height*0.75) + 1, n_rects)
+    x1s = rng.integers(0, width, n_rects)
+    y1s = rng.integers(0, height, n_rects)
+    colors = rng.integers(0, 256, (n_rects, 3))
+    for w, h, x1, y1, color in zip(ws, hs, x1s, y1s, colors):
+        x2 = min(x1 + w, width)
+        y2 = min(y1 + h, height)
+        # como ImageDraw.rectangle, el borde inferior/derecho es inclusivo
+        arr[y1:y2+1, x1:x2+1] = color
     
-    img_blured = img.filter(ImageFilter.GaussianBlur(radius=5))
-    enhancer = ImageEnhance.Color(img_blured)
-    img_desaturated = enhancer.enhance(0.4)
-    img_desaturated.save(filename, 'JPEG')
-    #return filename
-
-page_number_text=f"200"
-def add_page_number(canvas, doc):
+    # Difuminar y desaturar sobre el mismo arreglo, sin pasar por imágenes PIL
+    # intermedias. Box blur separable de radio 8 (dispersión similar a un
+    # gaussiano de radio 5)
+    blurred = box_blur(arr.astype(np.int32), 8)
+    
+    # Desaturar al 40% (equivale a ImageEnhance.Color(0.4)):
+    # mezcla 2/5 del color con 3/5 de la luminancia
+    luma = (blurred[..., 0]*77 + blurred[..., 1]*150 + blurred[..., 2]*29) >> 8
+    blurred *= 2
+    blurred += luma[..., None]*3
+    blurred //= 5
+    img_desaturated = PILImage.fromarray(blurred.astype(np.uint8))
+    buffer = BytesIO()
+    # Imagen intermedia descartable: codificación baseline rápida, sin
+    # pasada de optimización de Huffman y con submuestreo 4:2:0
+    img_desaturated.save(buffer, 'JPEG', quality=80, optimize=False, progressive=False, subsampling=2)
+    buffer.seek(0)
+    return buffer
+
+def add_page_number(canvas, doc, pagination="200", x=None):
     """Adds a page number to the bottom center of each page."""
     canvas.saveState()
     canvas.setFont('Times-Roman', 10)
-    #page_number_text = f"Page {doc.page}"
-    #page_number_text = f"235"
-    canvas.drawCentredString(doc.width / 2.0 + doc.leftMargin, 1 * inch, page_number_text)
+    #pagination = f"Page {doc.page}"
+    if x is None:
+        x = doc.width / 2.0 + doc.leftMargin
+    canvas.drawCentredString(x, 1 * inch, pagination)
     canvas.restoreState()
 
+def render_pages_jpeg(pdf_path, dpi=200, max_pages=None):
+    """
+    Rasteriza las páginas del PDF (hasta max_pages) y devuelve sus JPEG en
+    memoria (lista de bytes, en orden de página).
+    """
+    if fitz is not None:
+        with fitz.open(pdf_path) as pdf:
+            count = pdf.page_count if max_pages is None else min(max_pages, pdf.page_count)
+            return [pdf.load_page(i).get_pixmap(dpi=dpi).tobytes("jpeg") for i in range(count)]
+    
+    # Poppler escribe el JPEG directamente; no se decodifica/recodifica con PIL
+    with tempfile.TemporaryDirectory(prefix="dummy_page_") as output_folder:
+        paths = convert_from_path(pdf_path, dpi=dpi, fmt='jpeg', output_folder=output_folder,
+                                  paths_only=True, last_page=max_pages,
+                                  single_file=(max_pages == 1), output_file='dummy_page')
+        pages = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        return pages
+
+def render_first_page_jpeg(pdf_path, dpi=200):
+    """
+    Rasteriza la primera página del PDF y devuelve el JPEG en memoria (bytes).
+    Devuelve None si el PDF no tiene páginas.
+    """
+    pages = render_pages_jpeg(pdf_path, dpi=dpi, max_pages=1)
+    return pages[0] if pages else None
+
 def subtitle_if_no_subtitle_yet(elementos, paragraph_style, there_is_no_subtitle_yet):
     if there_is_no_subtitle_yet and random.random() < 0.25:
         elementos.append(Paragraph("<b>" + build_random_title_text() + "</b>", paragraph_style))
@@ -67,52 +177,14 @@ def subtitle_if_no_subtitle_yet(elementos, paragraph_style, there_is_no_subtitle
     else:
         return True
 
-def generar_pdf_justificado(destination="./dummy_page.jpg", type="right", pagination="123"):
-    """
-    Genera un archivo PDF con un párrafo de texto justificado.
-
-    Args:
-        texto (str): El texto que se incluirá en el PDF.
-        pdf_path (str, optional): El nombre del archivo PDF a generar.
-                                         Por defecto es "pdf_justificado.pdf".
-    """
-
+def page_margins(type):
+    """Márgenes izquierdo y derecho (en pulgadas) según la página sea izquierda o derecha"""
     if type == "right":
-        leftM = 0.6
-        rightM = 1.2
-    else:
-        leftM = 1.2
-        rightM = 0.6
-
-    pdf_path="/tmp/dummy_pdf.pdf"
-
-    doc = SimpleDocTemplate(
-        pdf_path,
-        pagesize=A5,
-        leftMargin=leftM*inch,
-        rightMargin=rightM*inch,
-        topMargin=0.9*inch,
-        bottomMargin=1.4*inch
-    )
-
-    global page_number_text 
-    page_number_text = pagination
-
-   # Registrar y usar fuente TrueType
-    pdfmetrics.registerFont(TTFont('Georgia', 'Georgia.ttf'))
-    pdfmetrics.registerFont(TTFont('Georgia-Bold', 'Georgia_Bold.ttf'))
-    pdfmetrics.registerFont(TTFont('Georgia-Italic', 'Georgia_Italic.ttf'))
-    pdfmetrics.registerFont(TTFont('Georgia-BoldItalic', 'Georgia_Bold_Italic.ttf'))
-
-    styles = getSampleStyleSheet()
-    paragraph_style = styles['Normal']
-    paragraph_style.alignment = TA_JUSTIFY
-    paragraph_style.fontName = 'Georgia'
-    title_style = styles['Heading1']
-    subtitle_style = styles['Heading4']
-
-    img_filename = "/tmp/dummy.jpg"
+        return 0.6, 1.2
+    return 1.2, 0.6
 
+def build_page_elements(paragraph_style, title_style):
+    """Arma el contenido aleatorio (flowables) de una página"""
     there_is_no_image_yet = True
     there_is_no_subtitle_yet = True
 
@@ -123,8 +195,7 @@ def generar_pdf_justificado(destination="./dummy_page.jpg", type="right", pagina
         elementos.append(Paragraph(build_random_paragraph_text(), paragraph_style))
         elementos.append(Spacer(1, 0.1 * inch))
     elif random.random() < 0.15:   
-        generate_geometric_pattern(width=275, height=150, filename=img_filename)
-        img1 = Image(img_filename, width=275, height=150)
+        img1 = Image(generate_geometric_pattern(width=275, height=150), width=275, height=150)
         elementos.append(img1)
         elementos.append(Spacer(1, 0.3 * inch))
         there_is_no_image_yet = False
@@ -134,8 +205,7 @@ def generar_pdf_justificado(destination="./dummy_page.jpg", type="right", pagina
 
     if there_is_no_image_yet and random.random() < 0.15:
         elementos.append(Spacer(1, 0.3 * inch))
-        generate_geometric_pattern(width=200, height=150, filename=img_filename)
-        img1 = Image(img_filename, width=200, height=150)
+        img1 = Image(generate_geometric_pattern(width=200, height=150), width=200, height=150)
         elementos.append(img1)
         elementos.append(Spacer(1, 0.3 * inch))
     else:
@@ -160,39 +230,129 @@ def generar_pdf_justificado(destination="./dummy_page.jpg", type="right", pagina
         elementos.append(Paragraph(build_random_paragraph_text(), paragraph_style))
         elementos.append(Spacer(1, 0.1 * inch))
 
-    doc.build(elementos, onFirstPage=add_page_number)
-
-    pages = convert_from_path(pdf_path)
-    if pages:
-        dummy_page = pages[0]
-        dummy_page.save(f'/tmp/dummy_page.jpg', 'JPEG')
-    else:
-        return False
+    return elementos
 
-    script_folder = os.path.dirname(os.path.abspath(__file__))
-    if not script_folder.endswith('/'):
-        script_folder = script_folder + '/'
-    script_path = script_folder + "vintage2.sh"  # Reemplaza con la ruta real
-    argumentos_script = ["/tmp/dummy_page.jpg", destination]  # Lista de argumentos
+def apply_vintage(page_jpeg, destination):
+    """Pasa la página rasterizada por vintage2.sh y guarda el resultado en destination"""
+    # "-" como archivo de entrada: la página se envía por stdin, sin pasar por disco
+    argumentos_script = ["-", destination]  # Lista de argumentos
     
     try:
         resultado = subprocess.run(
-            [script_path] + argumentos_script,
+            [_SCRIPT_PATH] + argumentos_script,
+            input=page_jpeg,
             capture_output=True,
-            text=True,
             check=True  # Lanza excepción si el código de salida no es 0
         )
     except subprocess.CalledProcessError as e:
-        print(e.stderr)
+        log.error("vintage2.sh falló: %s", e.stderr.decode(errors='replace'))
         return False
     except Exception as e:
-        print(str(e))
+        log.error("No se pudo ejecutar vintage2.sh: %s", e)
         return False
 
     return True
+
+def new_temp_pdf(tag):
+    """
+    Crear un PDF temporal vacío con nombre único y devolver su ruta.
+    Quien lo usa debe borrarlo al terminar.
+    """
+    fd, pdf_path = tempfile.mkstemp(prefix=f"dummy_pdf_{tag}_", suffix=".pdf")
+    os.close(fd)
+    return pdf_path
+
+def generar_pdf_justificado(destination="./dummy_page.jpg", type="right", pagination="123"):
+    """
+    Genera un archivo PDF con un párrafo de texto justificado.
+
+    Args:
+        texto (str): El texto que se incluirá en el PDF.
+        pdf_path (str, optional): El nombre del archivo PDF a generar.
+                                         Por defecto es "pdf_justificado.pdf".
+    """
+
+    leftM, rightM = page_margins(type)
+
+    # PDF temporal propio de cada página, para poder generar ambas
+    # páginas en paralelo sin pisarse; se borra apenas se rasteriza
+    pdf_path = new_temp_pdf(type)
+    try:
+        doc = SimpleDocTemplate(
+            pdf_path,
+            pagesize=A5,
+            leftMargin=leftM*inch,
+            rightMargin=rightM*inch,
+            topMargin=0.9*inch,
+            bottomMargin=1.4*inch
+        )
+
+        paragraph_style, title_style = _PARA_STYLE, _TITLE_STYLE
+        elementos = build_page_elements(paragraph_style, title_style)
+
+        # La paginación se pasa como argumento (sin estado global), así la
+        # función es reentrante entre hilos/procesos
+        doc.build(elementos, onFirstPage=partial(add_page_number, pagination=pagination))
+
+        page_jpeg = render_first_page_jpeg(pdf_path)
+    finally:
+        os.unlink(pdf_path)
+    if page_jpeg is None:
+        return False
+
+    return apply_vintage(page_jpeg, destination)
     # Build the document with pagination
     #doc.build(story, onFirstPage=add_page_number, onLaterPages=add_page_number)
 
+def generar_pdf_doble(path_left, path_right, pagination_left="22", pagination_right="23"):
+    """
+    Genera las páginas izquierda y derecha en un único PDF de dos páginas
+    (una sola construcción de ReportLab y una sola rasterización).
+    """
+    top_margin = 0.9*inch
+    bottom_margin = 1.4*inch
+    page_width, page_height = A5
+    frame_height = page_height - top_margin - bottom_margin
+
+    paragraph_style, title_style = _PARA_STYLE, _TITLE_STYLE
+
+    # Una plantilla por página, con sus márgenes y su número de página
+    templates = []
+    elementos = []
+    for type, pagination in (("left", pagination_left), ("right", pagination_right)):
+        leftM, rightM = page_margins(type)
+        frame_width = page_width - (leftM + rightM)*inch
+        frame = Frame(leftM*inch, bottom_margin, frame_width, frame_height, id=type)
+        templates.append(PageTemplate(
+            id=type,
+            frames=[frame],
+            onPage=partial(add_page_number, pagination=pagination, x=leftM*inch + frame_width/2.0)
+        ))
+
+        if elementos:
+            elementos.append(NextPageTemplate(type))
+            elementos.append(PageBreak())
+        # Lo que no entra en la página se recorta (como al rasterizar solo
+        # la primera página en generar_pdf_justificado)
+        elementos.append(KeepInFrame(frame_width, frame_height,
+                                     build_page_elements(paragraph_style, title_style),
+                                     mode='truncate'))
+
+    # PDF temporal, se borra apenas se rasteriza
+    pdf_path = new_temp_pdf("both")
+    try:
+        doc = BaseDocTemplate(pdf_path, pagesize=A5, topMargin=top_margin, bottomMargin=bottom_margin)
+        doc.addPageTemplates(templates)
+        doc.build(elementos)
+
+        pages = render_pages_jpeg(pdf_path, max_pages=2)
+    finally:
+        os.unlink(pdf_path)
+    if len(pages) < 2:
+        return False
+
+    return apply_vintage(pages[0], path_left) and apply_vintage(pages[1], path_right)
+
 LOREM_IPSUM_FRASES = [
     "Lorem ipsum dolor sit amet, consectetur adipiscing elit.",
     "Integer risus odio, auctor non pulvinar id, gravida ac arcu.",
@@ -249,30 +409,78 @@ LOREM_IPSUM_FRASES = [
 
 LOREM_IPSUM_WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit integer risus odio auctor non pulvinar id gravida ac arcu hasellus tempus odio vel metus tincidunt quis dictum risus dignissim"
 
+# Palabras y frases ya separadas, para no repetir el split en cada llamada
+_WORDS = tuple(LOREM_IPSUM_WORDS.split())
+_FRASES = tuple(LOREM_IPSUM_FRASES)
+
 def build_random_title_text():
     num_words = random.randint(3, 8)
-    words = LOREM_IPSUM_WORDS.split()
-    selected_words = random.sample(words, min(num_words, len(words)))
-    selected_words = " ".join(selected_words)
+    # con reemplazo: para texto de relleno no importa repetir palabras
+    selected_words = " ".join(random.choices(_WORDS, k=num_words))
     return selected_words.capitalize()
 
 def build_random_paragraph_text():
     num_frases = random.randint(3, 10)    
-    frases_seleccionadas = random.sample(LOREM_IPSUM_FRASES, min(num_frases, len(LOREM_IPSUM_FRASES)))
+    frases_seleccionadas = random.choices(_FRASES, k=num_frases)
     return " ".join(frases_seleccionadas)
 
-def get_dummy_capture(path_left, path_right):
-    if generar_pdf_justificado(path_left, type="left", pagination=f"22"):
-        print(f"left generado ok")
-        if generar_pdf_justificado(path_right, type="right", pagination=f"23"):
-            print(f"right generado ok")
-            return True
+# Pool de procesos para generar las páginas, creado en la primera captura y
+# reutilizado en las siguientes. Se usa forkserver (o spawn) en lugar de fork:
+# el pool se crea desde un hilo de la GUI, y un fork con Tk y otros hilos
+# activos puede copiar locks tomados (p. ej. el de logging) y bloquear al hijo
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Pool de procesos de get_dummy_capture (se crea la primera vez)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _executor = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context(start_method))
+        return _executor
+
+def get_dummy_capture(path_left, path_right, parallel=None):
+    """
+    Generar las páginas dummy izquierda y derecha.
+    parallel=None decide según el equipo: en paralelo si hay más de un núcleo.
+    """
+    if parallel is None:
+        # Núcleos que el proceso puede usar (no siempre todos los del equipo)
+        if hasattr(os, 'sched_getaffinity'):
+            cpus = len(os.sched_getaffinity(0))
         else:
-            return False
+            cpus = os.cpu_count() or 1
+        parallel = cpus > 1
+    if not parallel:
+        # Un solo PDF de dos páginas: conviene en equipos de un solo núcleo
+        if generar_pdf_doble(path_left, path_right, pagination_left=f"22", pagination_right=f"23"):
+            log.debug("left y right generados ok")
+            return True
+        return False
+    
+    # Ambas páginas son independientes y CPU-bound (ReportLab, pdf2image,
+    # vintage2.sh): generarlas en dos procesos en paralelo
+    executor = get_executor()
+    left = executor.submit(generar_pdf_justificado, path_left, type="left", pagination=f"22")
+    right = executor.submit(generar_pdf_justificado, path_right, type="right", pagination=f"23")
+    
+    # Esperar las dos páginas aunque la izquierda falle, para no dejar
+    # la derecha escribiéndose después de devolver
+    left_ok, right_ok = left.result(), right.result()
+    if left_ok:
+        log.debug("left generado ok")
+    else:
+        return False
+    if right_ok:
+        log.debug("right generado ok")
+        return True
     else:
         return False
 
 if __name__ == '__main__':
+    # Ejecutado como script: mostrar también los mensajes de depuración
+    logging.basicConfig(level=logging.DEBUG)
     #generar_pdf_justificado(type="left", pagination=f"23")
     if get_dummy_capture("left.jpg", "right.jpg"):
-        print(f"dummy generado OK!")
+        log.debug("dummy generado OK!")
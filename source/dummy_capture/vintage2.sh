@@ -1,6 +1,11 @@
 #!/bin/bash
 
-cp $1 $2
+# "-" como infile: leer la imagen desde stdin
+if [ "$1" = "-" ]; then
+	cat > "$2"
+else
+	cp "$1" "$2"
+fi
 exit 0
 
 #
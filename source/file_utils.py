@@ -4,6 +4,32 @@ from tkinter import messagebox
 import shutil
 from pathlib import Path
 import os
+import sys
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: no hay reflink, se usa copyfile
+
+# ioctl FICLONE de Linux (fcntl.FICLONE existe recién desde Python 3.12)
+_FICLONE = getattr(fcntl, 'FICLONE', 0x40049409) if sys.platform.startswith('linux') else None
+
+
+def _reflink(source_path, dest_fd):
+    """
+    Intentar clonar el archivo con FICLONE (btrfs, XFS...): el destino comparte
+    los bloques del original y la copia es prácticamente instantánea.
+    Devuelve False si el sistema de archivos no lo soporta.
+    """
+    if fcntl is None or _FICLONE is None:
+        return False
+    try:
+        with open(source_path, 'rb') as source:
+            fcntl.ioctl(dest_fd, _FICLONE, source.fileno())
+        return True
+    except OSError:
+        return False
+
 
 def copy_image_to_directory(source_path, dest_directory):
     """
@@ -24,17 +50,43 @@ def copy_image_to_directory(source_path, dest_directory):
         base_name = source_file.stem
         extension = source_file.suffix
         dest_filename = f"{base_name}{extension}"
-        dest_path = os.path.join(dest_directory, dest_filename)
         
-        # Si el archivo ya existe, agregar número secuencial
+        # Leer los nombres existentes con una sola lectura del directorio
+        # (en lugar de un stat por cada número probado)
+        with os.scandir(dest_directory) as entries:
+            used_names = {entry.name for entry in entries}
+        
+        # Si el archivo ya existe, agregar número secuencial. El nombre se
+        # reserva creándolo con O_EXCL, así dos copias simultáneas no
+        # pueden elegir el mismo nombre
         counter = 1
-        while os.path.exists(dest_path):
-            dest_filename = f"{base_name}_{counter:03d}{extension}"
+        while True:
+            while dest_filename in used_names:
+                dest_filename = f"{base_name}_{counter:03d}{extension}"
+                counter += 1
             dest_path = os.path.join(dest_directory, dest_filename)
-            counter += 1
+            try:
+                fd = os.open(dest_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                # Lo creó otro proceso después de leer el directorio
+                used_names.add(dest_filename)
+                continue
+            break
         
-        # Copiar archivo
-        shutil.copy2(source_path, dest_path)
+        # Copiar archivo: primero intentar un reflink sobre el archivo reservado;
+        # si no se puede, copiar solo el contenido (los metadatos del original no
+        # interesan, y copyfile puede usar copias en kernel como sendfile/copy_file_range)
+        try:
+            try:
+                cloned = _reflink(source_path, fd)
+            finally:
+                os.close(fd)
+            if not cloned:
+                shutil.copyfile(source_path, dest_path)
+        except Exception:
+            # No dejar el archivo reservado vacío
+            os.remove(dest_path)
+            raise
         return dest_filename
         
     except Exception as e:
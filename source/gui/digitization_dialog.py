@@ -1,9 +1,7 @@
 #!/usr/bin/env python3
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
-import json
+from tkinter import ttk, messagebox
 import os
 
 import bundle_types
@@ -15,6 +13,18 @@ from gui.progress_bar_widget import run_with_loading_dialog
 from gui.file_selector_dialog import ask_directory_no_hidden
 from gui.user_manager_dialog import authenticate_user
 from gui.new_project_dialog import create_new_project
+from gui.image_display_widget import ImageDisplay, save_thumbnail_sidecars, prefetch_thumbnails
+
+# Tipos de archivo del diálogo para agregar imágenes
+_FILE_TYPES = (
+    ('Imágenes', '*.jpg *.jpeg *.png *.gif *.bmp *.tiff'),
+    ('JPEG', '*.jpg *.jpeg'),
+    ('PNG', '*.png'),
+    ('Todos los archivos', '*.*')
+)
+
+# Carpeta personal del usuario
+_HOME = os.path.expanduser("~")
 
 class DigitizationDialog(ProjectManager):
     def __init__(self, root, settings):
@@ -99,9 +109,11 @@ class DigitizationDialog(ProjectManager):
         )
         self.directory_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        # Frame para las imágenes
+        # Frame para las imágenes (los displays se crean una vez y se reutilizan,
+        # ver prepare_display_slots)
         self.images_frame = ttk.Frame(main_frame)
         self.images_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
+        self.display_slots = []
         
         # Frame para controles
         controls_frame = ttk.Frame(main_frame)
@@ -191,8 +203,7 @@ class DigitizationDialog(ProjectManager):
             self.show_current_bundle()
         else:
             # Limpiar pantalla si no hay bundles
-            for widget in self.images_frame.winfo_children():
-                widget.destroy()
+            self.prepare_display_slots(0)
             self.update_info_label()
             self.update_navigation_buttons()
         return True
@@ -218,8 +229,7 @@ class DigitizationDialog(ProjectManager):
         # fijando el directorio por defecto para cargar siguientes proyectos
 
         # Limpiar pantalla 
-        for widget in self.images_frame.winfo_children():
-            widget.destroy()
+        self.prepare_display_slots(0)
         self.update_info_label()
         #self.update_navigation_buttons()
         return True
@@ -290,24 +300,62 @@ class DigitizationDialog(ProjectManager):
         if not self.current_project.bundles:
             return
         
-        # Limpiar displays anteriores
-        for widget in self.images_frame.winfo_children():
-            widget.destroy()
-        
-        current_bundle = self.current_project.bundles[self.current_bundle_index]
-        bundle_type = current_bundle.get('type', 'generic')
+        current_bundle = self._current_bundle()
+        bundle_type = self.current_project.bundle_types[self.current_bundle_index]
         
         # Por ahora solo procesamos bundles genéricos
         if bundle_type == 'generic':
             #self.process_generic_bundle(current_bundle)
             bundle_type_object = bundle_types.BundleGeneric()
             bundle_type_object.create_display(current_bundle, self)
+        else:
+            # Tipo sin display: ocultar las imágenes del bundle anterior
+            self.prepare_display_slots(0)
         
         # Actualizar información
         self.update_info_label()
         
         # Actualizar estado de botones
         self.update_navigation_buttons()
+        
+        # Adelantar la decodificación de los bundles vecinos
+        self._prefetch_neighbor_bundles()
+    
+    def prepare_display_slots(self, count): #GUI
+        """
+        Dejar visibles los primeros `count` displays de imagen y ocultar el resto.
+        Los displays que falten se crean; los demás se reutilizan sin destruirlos.
+        """
+        while len(self.display_slots) < count:
+            display_frame = ttk.Frame(self.images_frame)
+            self.display_slots.append((display_frame, ImageDisplay(self, display_frame)))
+        
+        # Los visibles siempre son los primeros, así que el orden se mantiene
+        for index, (display_frame, display) in enumerate(self.display_slots):
+            if index < count:
+                if not display_frame.winfo_manager():
+                    display_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+            elif display_frame.winfo_manager():
+                display_frame.pack_forget()
+        
+        return [display for display_frame, display in self.display_slots[:count]]
+    
+    def _current_bundle(self):
+        """Bundle que se está mostrando"""
+        return self.current_project.bundles[self.current_bundle_index]
+    
+    def _prefetch_neighbor_bundles(self):
+        """Cargar en el cache de miniaturas las imágenes del bundle anterior y siguiente"""
+        bundles = self.current_project.bundles
+        directory = self.current_project.directory
+        neighbor_paths = []
+        for index in (self.current_bundle_index + 1, self.current_bundle_index - 1):
+            if 0 <= index < len(bundles):
+                neighbor_paths.extend(
+                    os.path.join(directory, image_name)
+                    for image_name in bundles[index].get('images', [])
+                )
+        prefetch_thumbnails(neighbor_paths, widget=self.root)
     
     def previous_bundle(self): #GUI
         """Ir al bundle anterior"""
@@ -317,40 +365,46 @@ class DigitizationDialog(ProjectManager):
     
     def next_bundle(self): #GUI
         """Ir al siguiente bundle"""
-        if self.current_project.bundles and self.current_bundle_index < len(self.current_project.bundles) - 1:
+        bundles = self.current_project.bundles
+        if bundles and self.current_bundle_index < len(bundles) - 1:
             self.current_bundle_index += 1
             self.show_current_bundle()
     
     def update_navigation_buttons(self): #GUI
         """Actualizar estado de botones de navegación"""
-        if not self.current_project.bundles:
+        bundle_count = len(self.current_project.bundles)
+        if not bundle_count:
             self.prev_button.config(state='disabled')
             self.next_button.config(state='disabled')
             return
         
+        index = self.current_bundle_index
+        
         # Botón anterior
-        if self.current_bundle_index <= 0:
+        if index <= 0:
             self.prev_button.config(state='disabled')
         else:
             self.prev_button.config(state='normal')
         
         # Botón siguiente
-        if self.current_bundle_index >= len(self.current_project.bundles) - 1:
+        if index >= bundle_count - 1:
             self.next_button.config(state='disabled')
         else:
             self.next_button.config(state='normal')
     
     def update_info_label(self): #GUI
         """Actualizar label de información"""
-        if not self.current_project.bundles:
+        project = self.current_project
+        bundle_count = len(project.bundles)
+        if not bundle_count:
             self.info_label.config(text="No hay bundles cargados")
             return
         
-        current_bundle = self.current_project.bundles[self.current_bundle_index]
-        bundle_type = current_bundle.get('type', 'generic')
-        num_images = len(current_bundle.get('images', []))
+        index = self.current_bundle_index
+        bundle_type = project.bundle_types[index]
+        num_images = project.bundle_image_counts[index]
         
-        info_text = f"Posición {self.current_bundle_index + 1} de {len(self.current_project.bundles)} | Tipo: {bundle_type} | Objetos: {num_images}"
+        info_text = f"Posición {index + 1} de {bundle_count} | Tipo: {bundle_type} | Objetos: {num_images}"
         self.info_label.config(text=info_text)
 
 
@@ -396,10 +450,17 @@ class DigitizationDialog(ProjectManager):
             # Insertar bundle en la posición siguiente al actual
             insert_position = self.current_bundle_index + 1
             self.current_project.bundles.insert(insert_position, new_bundle)
+            self.current_project.index_bundles()
             
             # Actualizar archivo JSON
             result, message = self.current_project.save_bundles()
             if result:
+                # Miniaturas en segundo plano para las próximas navegaciones
+                save_thumbnail_sidecars([
+                    os.path.join(self.current_project.directory, filename)
+                    for filename in copied_filenames
+                ])
+                
                 # Avanzar a la nueva posición
                 self.current_bundle_index = insert_position
                 self.show_current_bundle()
@@ -407,6 +468,7 @@ class DigitizationDialog(ProjectManager):
             else:
                 # Si falla la actualización del JSON, revertir cambios
                 self.current_project.bundles.pop(insert_position)
+                self.current_project.index_bundles()
                 self._cleanup_copied_files(copied_filenames)
                 messagebox.showerror(*message)
                 return False
@@ -420,17 +482,13 @@ class DigitizationDialog(ProjectManager):
         Función de conveniencia que abre un diálogo para seleccionar imágenes
         y crear un bundle con ellas.
         """
-        file_types = [
-            ('Imágenes', '*.jpg *.jpeg *.png *.gif *.bmp *.tiff'),
-            ('JPEG', '*.jpg *.jpeg'),
-            ('PNG', '*.png'),
-            ('Todos los archivos', '*.*')
-        ]
+        # Importado aquí: solo se necesita al abrir el diálogo de archivos
+        from tkinter import filedialog
         
         selected_files = filedialog.askopenfilenames(
             title="Seleccionar imágenes para el bundle (máximo 3)",
-            filetypes=file_types,
-            initialdir=os.path.expanduser("~")
+            filetypes=_FILE_TYPES,
+            initialdir=_HOME
         )
         
         if selected_files:
@@ -444,9 +502,9 @@ class DigitizationDialog(ProjectManager):
         return False
 
     def add_bundle_from_dummy(self): #GUI
-        if self.current_project.subfolders["capture_subfolder"]:
-            path_left  = os.path.join(self.current_project.subfolders["capture_subfolder"], "left.jpg")
-            path_right = os.path.join(self.current_project.subfolders["capture_subfolder"], "right.jpg")
+        if self.current_project.capture_subfolder:
+            path_left  = os.path.join(self.current_project.capture_subfolder, "left.jpg")
+            path_right = os.path.join(self.current_project.capture_subfolder, "right.jpg")
             
             def operation():
                 # Tu código original aquí
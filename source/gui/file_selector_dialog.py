@@ -5,9 +5,39 @@ from tkinter import ttk, messagebox, filedialog
 import os
 import subprocess
 import platform
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 from project_manager import is_copista_project
 
+
+@functools.lru_cache(maxsize=1024)
+def _is_copista_project_cached(directory, mtime):
+    """
+    is_copista_project cacheado por (directorio, mtime del directorio).
+    Crear o borrar bundles.json cambia el mtime del directorio, así que
+    un proyecto nuevo aparece aunque ya se haya visitado la carpeta.
+    """
+    return is_copista_project(directory)
+
+
+def _probe_copista_project(entry):
+    """Consultar si una entrada de os.scandir es un Proyecto Copista, usando el cache"""
+    try:
+        mtime = entry.stat().st_mtime
+    except OSError:
+        return is_copista_project(entry.path)
+    return _is_copista_project_cached(entry.path, mtime)
+
+
+# Hilo para consultar qué carpetas son proyectos sin bloquear el diálogo
+_probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ProjectProbe")
+
+
+def _probe_copista_projects(entries):
+    """Índices de las entradas que son Proyectos Copista (no toca Tk)"""
+    return [index for index, entry in enumerate(entries) if _probe_copista_project(entry)]
+
 # Opción 2: Diálogo personalizado con Tkinter
 class ProjectSelector:
     def __init__(self, parent, title="Seleccionar Proyecto", initial_dir=None, base_projects=None ):
@@ -16,14 +46,19 @@ class ProjectSelector:
         self.current_path = initial_dir or os.getcwd()
         self.base_projects = base_projects
         
+        # (nombre, es_proyecto) de cada fila del listbox, en el mismo orden;
+        # es_proyecto es None mientras no se haya consultado
+        self._entries = []
+        # Cambia con cada listado, para descartar consultas de listados anteriores
+        self._listing_id = 0
+        
         # Crear ventana
         self.dialog = tk.Toplevel(parent)
         self.dialog.title(title)
-        self.dialog.geometry("600x400")
         self.dialog.transient(parent)
         self.dialog.grab_set()
         
-        # Centrar ventana
+        # Tamaño y posición centrada, antes de crear el contenido
         self.center_window()
         
         # Crear interfaz
@@ -33,7 +68,8 @@ class ProjectSelector:
         self.load_directory(self.current_path)
     
     def center_window(self):
-        self.dialog.update_idletasks()
+        # El tamaño de la pantalla no depende del contenido del diálogo:
+        # no hace falta procesar las tareas pendientes (update_idletasks)
         x = (self.dialog.winfo_screenwidth() // 2) - (600 // 2)
         y = (self.dialog.winfo_screenheight() // 2) - (400 // 2)
         self.dialog.geometry(f"600x400+{x}+{y}")
@@ -96,45 +132,86 @@ class ProjectSelector:
             
             # Limpiar lista
             self.dir_listbox.delete(0, tk.END)
+            self._entries = []
+            self._listing_id += 1
             
-            # Obtener contenido
+            # Obtener contenido (scandir trae el tipo de cada entrada con la
+            # lectura del directorio, sin un stat por entrada)
             items = []
             try:
-                for item in os.listdir(self.current_path):
-                    # FILTRAR ARCHIVOS OCULTOS (que empiezan con punto)
-                    if not item.startswith('.'):
-                        item_path = os.path.join(self.current_path, item)
-                        if os.path.isdir(item_path):
-                            items.append(item)
+                with os.scandir(self.current_path) as entries:
+                    for entry in entries:
+                        # FILTRAR ARCHIVOS OCULTOS (que empiezan con punto)
+                        if not entry.name.startswith('.') and entry.is_dir():
+                            items.append(entry)
             except PermissionError:
                 self.dir_listbox.insert(tk.END, "[Sin permisos para leer este directorio]")
                 return
             
-            # Ordenar y agregar a la lista
-            items.sort()
-            for item in items:
-                if is_copista_project(os.path.join(self.current_path, item)):
-                    self.dir_listbox.insert(tk.END, f"🤖 {item}")
-                else:
-                    self.dir_listbox.insert(tk.END, f"📁 {item}")
+            # Ordenar y agregar a la lista (en una sola llamada a Tcl); todas se
+            # muestran como carpetas y los proyectos se marcan al consultarlos
+            items.sort(key=lambda entry: entry.name)
+            self._entries = [(entry.name, None) for entry in items]
+            if items:
+                self.dir_listbox.insert(tk.END, *[f"📁 {entry.name}" for entry in items])
+                self.start_project_probe(items)
                 
         except Exception as e:
             self.dir_listbox.delete(0, tk.END)
+            self._entries = []
             self.dir_listbox.insert(tk.END, f"[Error: {str(e)}]")
     
+    def start_project_probe(self, items):
+        """Consultar en segundo plano qué carpetas del listado son proyectos"""
+        listing_id = self._listing_id
+        future = _probe_executor.submit(_probe_copista_projects, items)
+        
+        def on_probed(done):
+            try:
+                self.dialog.after(0, self.mark_projects, listing_id, done)
+            except (tk.TclError, RuntimeError):
+                pass  # El diálogo ya se cerró
+        
+        future.add_done_callback(on_probed)
+    
+    def mark_projects(self, listing_id, future):
+        """Marcar con 🤖 las filas que resultaron ser proyectos (en el hilo de Tk)"""
+        if listing_id != self._listing_id or not self.dialog.winfo_exists():
+            return  # Se cambió de directorio mientras se consultaba
+        if future.exception() is not None:
+            return  # Quedan como carpetas; selected_entry consulta al elegirlas
+        
+        project_indexes = set(future.result())
+        selection = self.dir_listbox.curselection()
+        for index, (name, is_project) in enumerate(self._entries):
+            self._entries[index] = (name, index in project_indexes)
+        for index in project_indexes:
+            self.dir_listbox.delete(index)
+            self.dir_listbox.insert(index, f"🤖 {self._entries[index][0]}")
+        for index in selection:
+            self.dir_listbox.selection_set(index)
+    
+    def selected_entry(self):
+        """(nombre, es_proyecto) de la fila seleccionada, o None si no hay selección válida"""
+        selection = self.dir_listbox.curselection()
+        if selection and selection[0] < len(self._entries):
+            name, is_project = self._entries[selection[0]]
+            if is_project is None:
+                # Todavía no se consultó: hacerlo ahora
+                is_project = is_copista_project(os.path.join(self.current_path, name))
+            return name, is_project
+        return None
+    
     def on_double_click(self, event):
         """Manejar doble clic en directorio"""
-        selection = self.dir_listbox.curselection()
-        if selection:
-            item = self.dir_listbox.get(selection[0])
-            if item.startswith("📁 "):
-                dir_name = item[2:]  # Remover emoji
-                new_path = os.path.join(self.current_path, dir_name)
-                self.load_directory(new_path)
-            elif item.startswith("🤖 "):
-                dir_name = item[2:]  # Remover emoji
+        entry = self.selected_entry()
+        if entry:
+            dir_name, is_project = entry
+            if is_project:
                 self.current_path = os.path.join(self.current_path, dir_name)
                 self.select_current()
+            else:
+                self.load_directory(os.path.join(self.current_path, dir_name))
     
     def go_up(self):
         """Ir al directorio padre"""
@@ -153,11 +230,10 @@ class ProjectSelector:
                 
     def select_selection(self):
         """Seleccionar directorio actual"""
-        selection = self.dir_listbox.curselection()
-        if selection: 
-            item = self.dir_listbox.get(selection[0])
-            if item.startswith("🤖 "):
-                dir_name = item[2:]  # Remover emoji
+        entry = self.selected_entry()
+        if entry:
+            dir_name, is_project = entry
+            if is_project:
                 self.current_path = os.path.join(self.current_path, dir_name)
                 self.select_current()
             else:
@@ -4,60 +4,342 @@ import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
+# Tamaño máximo de la imagen dentro del display
+DISPLAY_WIDTH = 350
+DISPLAY_HEIGHT = 400
 
-def create_default_image_display(app, parent, image_path):
-    """Crear un display compuesto con imagen y botón"""
-    # Container principal del display
-    display_container = ttk.Frame(parent, relief='ridge', borderwidth=1)
-    display_container.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+# Cache LRU de imágenes ya decodificadas y redimensionadas,
+# para no volver a decodificar al navegar entre bundles
+PHOTO_CACHE_SIZE = 64
+_photo_cache = OrderedDict()
+
+# Cache de imágenes PIL ya redimensionadas que todavía no se pasaron a Tk
+# (p. ej. las adelantadas); misma clave que _photo_cache. Se usa desde los
+# hilos de decodificación, por eso el lock
+_thumbnail_cache = OrderedDict()
+_thumbnail_cache_lock = threading.Lock()
+
+# Si ya se definieron los estilos ttk de los labels (ver _ensure_label_styles)
+_label_styles_ready = False
+
+# Carpeta (dentro del proyecto) con miniaturas precalculadas de cada imagen
+THUMBS_FOLDER = '.copista_thumbs'
+
+# Hilos para decodificar imágenes fuera del hilo de Tk
+# (la decodificación JPEG de PIL libera el GIL)
+_decode_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ImageDecode")
+
+
+def photo_cache_key(image_path, size=(DISPLAY_WIDTH, DISPLAY_HEIGHT), mtime=None):
+    """Clave del cache: ruta, fecha de modificación y tamaño del display"""
+    if mtime is None:
+        mtime = os.path.getmtime(image_path)
+    return (image_path, mtime, size)
+
+
+def get_cached_photo(key):
+    """Obtener un PhotoImage del cache, o None si no está"""
+    photo = _photo_cache.get(key)
+    if photo is not None:
+        _photo_cache.move_to_end(key)
+    return photo
+
+
+def store_cached_photo(key, photo):
+    """Guardar un PhotoImage en el cache, descartando el menos usado si se llena"""
+    _photo_cache[key] = photo
+    if len(_photo_cache) > PHOTO_CACHE_SIZE:
+        _photo_cache.popitem(last=False)
+
+
+def decode_thumbnail(image_path, size=(DISPLAY_WIDTH, DISPLAY_HEIGHT)):
+    """
+    Cargar y redimensionar una imagen manteniendo proporción.
+    No toca Tk, por lo que puede ejecutarse en un hilo secundario.
+    """
+    # Buffer de lectura grande: PIL lee el archivo en muchos trozos pequeños
+    with open(image_path, 'rb', buffering=1 << 20) as image_file:
+        pil_image = Image.open(image_file)
+        
+        # En JPEG, pedir a libjpeg que decodifique ya reducido (1/2, 1/4 o 1/8),
+        # dejando margen del doble para que el redimensionado final conserve calidad
+        if pil_image.format == 'JPEG':
+            pil_image.draft('RGB', (size[0] * 2, size[1] * 2))
+        
+        # Decodificar antes de cerrar el archivo (thumbnail no lo hace si la
+        # imagen ya es suficientemente chica, como las miniaturas guardadas)
+        pil_image.load()
     
-    # Frame para la imagen (parte superior del display)
-    image_frame = ttk.Frame(display_container)
-    image_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    pil_image.thumbnail(size, resample_filter_for(pil_image.size, size))
+    return pil_image
+
+
+def resample_filter_for(image_size, size):
+    """
+    Filtro de redimensionado según cuánto se achica la imagen: con reducciones
+    grandes BOX/BILINEAR dan el mismo resultado visual que LANCZOS, mucho más rápido.
+    """
+    # (compatible con versiones antiguas de Pillow)
+    resampling = getattr(Image, 'Resampling', Image)
     
+    shrink = max(image_size[0] / size[0], image_size[1] / size[1])
+    if shrink > 4:
+        return resampling.BOX
+    if shrink > 2:
+        return resampling.BILINEAR
+    return resampling.LANCZOS
+
+
+def _load_thumbnail(image_path, mtime, width, height):
+    """Decodificar la miniatura de una imagen, desde la guardada si está al día"""
+    # Usar la miniatura guardada si es al menos tan nueva como la imagen
+    sidecar = thumbnail_sidecar_path(image_path, (width, height))
     try:
-        # Cargar y redimensionar imagen
-        pil_image = Image.open(image_path)
+        if os.stat(sidecar).st_mtime >= mtime:
+            return decode_thumbnail(sidecar, (width, height))
+    except OSError:
+        pass  # No hay miniatura (o no se pudo leer): decodificar la original
+    return decode_thumbnail(image_path, (width, height))
+
+
+def thumbnail_sidecar_path(image_path, size=(DISPLAY_WIDTH, DISPLAY_HEIGHT)):
+    """Ruta de la miniatura guardada de una imagen: <carpeta>/.copista_thumbs/<nombre>_<ancho>x<alto>.jpg"""
+    folder, name = os.path.split(image_path)
+    return os.path.join(folder, THUMBS_FOLDER, f"{name}_{size[0]}x{size[1]}.jpg")
+
+
+def write_thumbnail_sidecar(image_path, size=(DISPLAY_WIDTH, DISPLAY_HEIGHT)):
+    """Generar y guardar la miniatura de una imagen (no toca Tk)"""
+    sidecar = thumbnail_sidecar_path(image_path, size)
+    os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+    
+    thumb = decode_thumbnail(image_path, size)
+    if thumb.mode not in ('RGB', 'L'):
+        thumb = thumb.convert('RGB')
+    
+    # Escribir con otro nombre y renombrar, para que nunca se lea a medio escribir
+    tmp_path = sidecar + '.tmp'
+    thumb.save(tmp_path, 'JPEG', quality=85)
+    os.replace(tmp_path, sidecar)
+    return sidecar
+
+
+def save_thumbnail_sidecars(image_paths, size=(DISPLAY_WIDTH, DISPLAY_HEIGHT)):
+    """
+    Generar en segundo plano las miniaturas de imágenes recién agregadas.
+    Si alguna falla, el display simplemente decodifica la imagen original.
+    """
+    for image_path in image_paths:
+        future = _decode_executor.submit(write_thumbnail_sidecar, image_path, size)
+        future.add_done_callback(lambda done: done.exception())
+
+
+def prefetch_thumbnails(image_paths, size=(DISPLAY_WIDTH, DISPLAY_HEIGHT), widget=None):
+    """
+    Decodificar en segundo plano imágenes que probablemente se muestren pronto
+    (p. ej. los bundles vecinos), dejándolas en el cache de miniaturas.
+    Si se pasa un widget, además se crea el PhotoImage en el hilo de Tk, para
+    que al mostrarlas se pinten directo desde el cache, sin "Cargando...".
+    """
+    for image_path in image_paths:
+        try:
+            key = photo_cache_key(image_path, size)
+        except OSError:
+            continue  # La imagen no existe: el display mostrará el error
+        if key in _photo_cache:
+            continue
+        future = _decode_executor.submit(load_thumbnail, image_path, size, key[1])
+        if widget is None:
+            future.add_done_callback(lambda done: done.exception())
+            continue
         
-        # Redimensionar manteniendo proporción
-        display_width = 350
-        display_height = 400
+        def on_decoded(done, key=key):
+            try:
+                widget.after(0, _store_prefetched_photo, key, done)
+            except (tk.TclError, RuntimeError):
+                pass  # La ventana ya no existe
         
-        # (compatible con versiones antiguas de Pillow)
+        future.add_done_callback(on_decoded)
+
+
+def _store_prefetched_photo(key, future):
+    """Crear en el hilo de Tk el PhotoImage de una imagen adelantada"""
+    if future.exception() is not None or key in _photo_cache:
+        return
+    pil_image = future.result()
+    try:
+        store_cached_photo(key, ImageTk.PhotoImage(pil_image))
+    except Exception:
+        return  # Al mostrarla se vuelve a decodificar y se informa el error
+    release_thumbnail(key, pil_image)
+
+
+def load_thumbnail(image_path, size=(DISPLAY_WIDTH, DISPLAY_HEIGHT), mtime=None):
+    """
+    Obtener la miniatura PIL, cacheada por ruta, fecha de modificación y tamaño
+    (si el archivo cambia, cambia la clave). Puede llamarse desde cualquier hilo.
+    """
+    if mtime is None:
+        mtime = os.path.getmtime(image_path)
+    key = (image_path, mtime, tuple(size))
+    
+    with _thumbnail_cache_lock:
+        pil_image = _thumbnail_cache.get(key)
+        if pil_image is not None:
+            _thumbnail_cache.move_to_end(key)
+            return pil_image
+    
+    pil_image = _load_thumbnail(image_path, mtime, size[0], size[1])
+    
+    with _thumbnail_cache_lock:
+        _thumbnail_cache[key] = pil_image
+        if len(_thumbnail_cache) > PHOTO_CACHE_SIZE:
+            _thumbnail_cache.popitem(last=False)
+    return pil_image
+
+
+def release_thumbnail(key, pil_image):
+    """
+    Liberar una miniatura PIL una vez copiada a un PhotoImage: Tk ya tiene
+    sus propios píxeles y el PhotoImage queda en su cache.
+    """
+    with _thumbnail_cache_lock:
+        if _thumbnail_cache.get(key) is pil_image:
+            del _thumbnail_cache[key]
+    pil_image.close()
+
+
+def _ensure_label_styles(widget):
+    """
+    Definir una sola vez los estilos ttk de los labels del display, en lugar
+    de pasar fuente y color a cada label (se necesita Tk ya creado)
+    """
+    global _label_styles_ready
+    if _label_styles_ready:
+        return
+    style = ttk.Style(widget)
+    style.configure('ImageName.TLabel', font=('Arial', 8), foreground='gray')
+    style.configure('ImageError.TLabel', foreground='red')
+    _label_styles_ready = True
+
+
+def _show_image_error(image_label, image_path, error):
+    """Reemplazar el contenido del label por el mensaje de error"""
+    image_label.configure(
+        image='',
+        text=f"Error cargando:\n{image_path}\n{str(error)[:50]}...",
+        justify=tk.CENTER,
+        style='ImageError.TLabel'
+    )
+    image_label.image = None
+
+
+def _finish_image_display(display, image_path, key, future):
+    """Completar el display en el hilo de Tk cuando termina la decodificación"""
+    if not display.image_label.winfo_exists():
+        return  # El display se destruyó mientras se decodificaba
+    if display.key != key:
+        return  # El display ya se reutilizó para otra imagen
+    photo = get_cached_photo(key)
+    if photo is None:
         try:
-            pil_image.thumbnail((display_width, display_height), Image.Resampling.LANCZOS)
-        except AttributeError:
-            # Para versiones anteriores de Pillow
-            pil_image.thumbnail((display_width, display_height), Image.LANCZOS)
+            # Convertir para tkinter (debe hacerse en el hilo de Tk)
+            pil_image = future.result()
+            photo = ImageTk.PhotoImage(pil_image)
+        except Exception as e:
+            _show_image_error(display.image_label, image_path, e)
+            return
+        store_cached_photo(key, photo)
+        release_thumbnail(key, pil_image)
+    display.image_label.configure(image=photo, text='')
+    display.image_label.image = photo  # Mantener referencia
+
+
+class ImageDisplay:
+    """
+    Display compuesto con imagen, nombre de archivo y botón.
+    Los widgets se crean una sola vez; show() cambia la imagen mostrada,
+    así el display puede reutilizarse al navegar entre bundles.
+    """
+    def __init__(self, app, parent):
+        self.app = app
+        self.image_path = None
+        self.key = None
+        
+        _ensure_label_styles(parent)
         
-        # Convertir para tkinter
-        photo = ImageTk.PhotoImage(pil_image)
+        # Container principal del display
+        self.display_container = ttk.Frame(parent, relief='ridge', borderwidth=1)
+        self.display_container.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+        
+        # Frame para la imagen (parte superior del display)
+        image_frame = ttk.Frame(self.display_container)
+        image_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Label para mostrar imagen
-        image_label = ttk.Label(image_frame, image=photo)
-        image_label.image = photo  # Mantener referencia
-        image_label.pack(expand=True)
+        self.image_label = ttk.Label(image_frame)
+        self.image_label.pack(expand=True)
         
         # Label con nombre de archivo (pequeño, debajo de la imagen)
-        name_label = ttk.Label(image_frame, text=os.path.basename(image_path), font=('Arial', 8), foreground='gray')
-        name_label.pack(pady=(5, 0))
-        
-    except Exception as e:
-        # Si hay error cargando la imagen, mostrar placeholder
-        error_label = ttk.Label(
-            image_frame, 
-            text=f"Error cargando:\n{image_path}\n{str(e)[:50]}...",
-            justify=tk.CENTER,
-            foreground='red'
+        self.name_label = ttk.Label(image_frame, style='ImageName.TLabel')
+        self.name_label.pack(pady=(5, 0))
+        
+        # Botón del display (parte inferior del display compuesto)
+        display_button = ttk.Button(
+            self.display_container,
+            text="Capture",
+            command=lambda: self.app.image_function(self.image_path)
         )
-        error_label.pack(expand=True)
+        display_button.pack(fill=tk.X, padx=5, pady=(0, 5))
     
-    # Botón del display (parte inferior del display compuesto)
-    display_button = ttk.Button(
-        display_container,
-        text="Capture",
-        command=lambda: app.image_function(image_path)
-    )
-    display_button.pack(fill=tk.X, padx=5, pady=(0, 5))
+    def show(self, image_path, mtime=None):
+        """
+        Mostrar una imagen en el display.
+        Si se conoce la fecha de modificación (mtime) se evita un stat del archivo.
+        """
+        self.image_path = image_path
+        self.key = None
+        self.image_label.configure(style='TLabel')
+        
+        try:
+            key = photo_cache_key(image_path, mtime=mtime)
+            self.key = key
+            photo = get_cached_photo(key)
+            
+            if photo is not None:
+                self.image_label.configure(image=photo, text='')
+                self.image_label.image = photo  # Mantener referencia
+            else:
+                # Decodificar en segundo plano y completar el label desde el hilo de Tk
+                self.image_label.configure(image='', text="Cargando...")
+                self.image_label.image = None
+                future = _decode_executor.submit(load_thumbnail, image_path, key[2], key[1])
+                
+                def on_decoded(done):
+                    try:
+                        self.image_label.after(0, _finish_image_display, self, image_path, key, done)
+                    except (tk.TclError, RuntimeError):
+                        pass  # La ventana ya no existe
+                
+                future.add_done_callback(on_decoded)
+            
+            self.name_label.configure(text=os.path.basename(image_path))
+        
+        except Exception as e:
+            # Si hay error cargando la imagen, mostrar placeholder
+            _show_image_error(self.image_label, image_path, e)
+            self.name_label.configure(text='')
+
 
+def create_default_image_display(app, parent, image_path, mtime=None):
+    """
+    Crear un display compuesto con imagen y botón.
+    Si se conoce la fecha de modificación (mtime) se evita un stat del archivo.
+    """
+    display = ImageDisplay(app, parent)
+    display.show(image_path, mtime)
+    return display
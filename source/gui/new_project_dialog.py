@@ -4,7 +4,35 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import uuid
 import re
-from slugify import slugify
+import unicodedata
+
+# Formato válido del identificador: al menos 3 letras, números, guiones o guiones bajos
+_IDENT_RE = re.compile(r'[A-Za-z0-9_-]{3,}\Z')
+
+# Letras latinas que NFKD no descompone, transliteradas como lo hace slugify
+# (unidecode), y apóstrofos, que slugify elimina sin separar las palabras
+_LATIN_TABLE = str.maketrans({
+    'ß': 'ss', 'ẞ': 'SS', 'Œ': 'OE', 'œ': 'oe', 'Æ': 'AE', 'æ': 'ae',
+    'Ø': 'O', 'ø': 'o', 'Ł': 'L', 'ł': 'l', 'Đ': 'D', 'đ': 'd',
+    'Ð': 'D', 'ð': 'd', 'Þ': 'TH', 'þ': 'th',
+    "'": None, '’': None,
+})
+
+# Tabla para str.translate: todo lo que no sea letra o número ASCII pasa a '_'
+_SLUG_TABLE = {c: '_' for c in range(128) if not chr(c).isalnum()}
+
+
+def _fast_ident(title, max_length=25):
+    """
+    Identificador a partir del título: sin acentos, en mayúsculas, con '_'
+    como único separador. Da lo mismo que slugify para títulos en alfabeto
+    latino; los caracteres de otras escrituras (griego, cirílico, CJK...) se
+    descartan en lugar de transliterarse.
+    """
+    latin_title = title.translate(_LATIN_TABLE)
+    ascii_title = unicodedata.normalize('NFKD', latin_title).encode('ascii', 'ignore').decode('ascii')
+    words = ascii_title.translate(_SLUG_TABLE).split('_')
+    return '_'.join(word for word in words if word).upper()[:max_length]
 
 class NewProjectDialog:
     """Diálogo para crear un nuevo proyecto"""
@@ -16,27 +44,28 @@ class NewProjectDialog:
         
         # Variables de los campos
         self.title_var = tk.StringVar()
-        self.description_var = tk.StringVar()
         self.identifier_var = tk.StringVar()
         
+        # Actualización pendiente del ID a partir del título (ver on_title_changed)
+        self._slug_after_id = None
+        
         # Generar ID único por defecto
         self.generate_unique_id()
         
     def generate_unique_id(self):
         """Genera un identificador único automáticamente"""
-        new_id = str(uuid.uuid4())[:8].upper()  # 8 caracteres del UUID
+        new_id = uuid.uuid4().hex[:8].upper()  # 8 caracteres del UUID
         self.identifier_var.set(f"PRE_{new_id}")
     
     def validate_identifier(self, identifier):
         """Valida que el identificador cumpla con el formato requerido"""
         # Solo letras, números y guiones bajos, no espacios
-        pattern = re.compile(r'^[A-Za-z0-9_-]+$')
-        return bool(pattern.match(identifier)) and len(identifier) >= 3
+        return _IDENT_RE.match(identifier) is not None
     
     def validate_fields(self):
         """Valida todos los campos del formulario"""
         title = self.title_var.get().strip()
-        description = self.description_var.get().strip()
+        description = self.desc_text.get('1.0', 'end-1c').strip()
         identifier = self.identifier_var.get().strip()
         
         errors = []
@@ -54,20 +83,33 @@ class NewProjectDialog:
         # Validar identificador
         if not identifier:
             errors.append("El identificador es obligatorio")
-        elif not self.validate_identifier(identifier):
-            errors.append("El identificador solo puede contener letras, números, guiones y guiones bajos")
         elif len(identifier) < 3:
             errors.append("El identificador debe tener al menos 3 caracteres")
+        elif not self.validate_identifier(identifier):
+            errors.append("El identificador solo puede contener letras, números, guiones y guiones bajos")
         
         return errors
     
     def on_title_changed(self, *args):
+        """
+        Programa la generación del ID basado en el título para cuando el
+        usuario deje de escribir, en lugar de recalcularlo en cada tecla
+        """
+        if self.dialog is None:
+            self._do_slug_update()
+            return
+        if self._slug_after_id is not None:
+            self.dialog.after_cancel(self._slug_after_id)
+        self._slug_after_id = self.dialog.after(150, self._do_slug_update)
+    
+    def _do_slug_update(self):
         """Genera automáticamente el ID basado en el título"""
+        self._slug_after_id = None
         title = self.title_var.get()
         if title:
             # Generar ID basado en el título
             #id_base = re.sub(r'[^a-zA-Z0-9]', '_', titulo).upper()[:15]
-            id_base = re.sub('-', '_', slugify(title)).upper()[:25]
+            id_base = _fast_ident(title)
             if id_base:
                 self.identifier_var.set(f"{id_base}")
                 #self.identifier_var.set(f"{id_base}_{uuid.uuid4().hex[:4].upper()}")
@@ -115,12 +157,7 @@ class NewProjectDialog:
         desc_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         desc_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        # Conectar Text widget con StringVar
-        def on_desc_change(*args):
-            content = desc_text.get('1.0', 'end-1c')
-            self.description_var.set(content)
-        
-        desc_text.bind('<KeyRelease>', on_desc_change)
+        # El contenido se lee al validar y crear, no en cada tecla
         self.desc_text = desc_text  # Guardar referencia
         
         # Etiqueta de ayuda para descripción
@@ -176,6 +213,11 @@ class NewProjectDialog:
     
     def create_project(self):
         """Procesar la creación del proyecto"""
+        # Si quedó pendiente la actualización del ID, aplicarla antes de validar
+        if self._slug_after_id is not None:
+            self.dialog.after_cancel(self._slug_after_id)
+            self._do_slug_update()
+        
         errors = self.validate_fields()
         
         if errors:
@@ -186,7 +228,7 @@ class NewProjectDialog:
         # Si todo está bien, crear el resultado
         self.result = {
             'title': self.title_var.get().strip(),
-            'description': self.description_var.get().strip(),
+            'description': self.desc_text.get('1.0', 'end-1c').strip(),
             'identifier': self.identifier_var.get().strip(),
             'created': True
         }
@@ -206,18 +248,16 @@ class NewProjectDialog:
         # Crear ventana del diálogo
         self.dialog = tk.Toplevel(self.parent)
         self.dialog.title("Nuevo Proyecto")
-        self.dialog.geometry("500x450")
         self.dialog.resizable(True, False)
         
         # Configurar como diálogo modal
         self.dialog.transient(self.parent)
         self.dialog.grab_set()
         
-        # Centrar en pantalla
-        self.dialog.update_idletasks()
-        x = (self.dialog.winfo_screenwidth() // 2) - (self.dialog.winfo_width() // 2)
-        y = (self.dialog.winfo_screenheight() // 2) - (self.dialog.winfo_height() // 2)
-        self.dialog.geometry(f"+{x}+{y}")
+        # Tamaño y posición centrada en pantalla (el tamaño es fijo, no hace falta medirla)
+        x = (self.dialog.winfo_screenwidth() // 2) - (500 // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (450 // 2)
+        self.dialog.geometry(f"500x450+{x}+{y}")
         
         # Crear widgets
         self.create_widgets()
@@ -3,7 +3,7 @@
 import tkinter as tk
 from tkinter import ttk
 import threading
-import time
+import queue
 
 class LoadingDialog:
     """Ventana de carga simple con mensaje y barra de progreso"""
@@ -14,10 +14,9 @@ class LoadingDialog:
         # Crear ventana modal
         self.dialog = tk.Toplevel(parent)
         self.dialog.title(title)
-        self.dialog.geometry("300x120")
         self.dialog.resizable(False, False)
         
-        # Centrar ventana
+        # Tamaño y posición centrada
         self.center_window()
         
         # Hacer modal
@@ -34,8 +33,7 @@ class LoadingDialog:
         self.finished = False
     
     def center_window(self):
-        """Centrar ventana en la pantalla"""
-        self.dialog.update_idletasks()
+        """Centrar ventana en la pantalla (el tamaño es fijo, no hace falta medirla)"""
         x = (self.dialog.winfo_screenwidth() // 2) - (300 // 2)
         y = (self.dialog.winfo_screenheight() // 2) - (120 // 2)
         self.dialog.geometry(f"300x120+{x}+{y}")
@@ -58,7 +56,7 @@ class LoadingDialog:
     def update_message(self, new_message):
         """Actualizar mensaje de la ventana"""
         self.message_label.config(text=new_message)
-        self.dialog.update()
+        self.dialog.update_idletasks()
     
     def close(self):
         """Cerrar ventana de carga"""
@@ -78,10 +76,9 @@ class SpinnerDialog:
         # Crear ventana
         self.dialog = tk.Toplevel(parent)
         self.dialog.title(title)
-        self.dialog.geometry("250x100")
         self.dialog.resizable(False, False)
         
-        # Centrar y hacer modal
+        # Tamaño y posición centrada, y hacer modal
         self.center_window()
         self.dialog.transient(parent)
         self.dialog.grab_set()
@@ -94,8 +91,7 @@ class SpinnerDialog:
         self.animate_spinner()
     
     def center_window(self):
-        """Centrar ventana"""
-        self.dialog.update_idletasks()
+        """Centrar ventana (el tamaño es fijo, no hace falta medirla)"""
         x = (self.dialog.winfo_screenwidth() // 2) - (250 // 2)
         y = (self.dialog.winfo_screenheight() // 2) - (100 // 2)
         self.dialog.geometry(f"250x100+{x}+{y}")
@@ -118,7 +114,7 @@ class SpinnerDialog:
         self.message_label.pack(pady=(10, 0))
         
         # Caracteres del spinner
-        self.spinner_chars = ["⟳", "⟲", "⟳", "⟲"]
+        self.spinner_chars = ("⟳", "⟲")
         self.spinner_index = 0
     
     def animate_spinner(self):
@@ -132,7 +128,7 @@ class SpinnerDialog:
     def update_message(self, new_message):
         """Actualizar mensaje"""
         self.message_label.config(text=new_message)
-        self.dialog.update()
+        self.dialog.update_idletasks()
     
     def close(self):
         """Cerrar ventana"""
@@ -140,6 +136,62 @@ class SpinnerDialog:
         self.dialog.grab_release()
         self.dialog.destroy()
 
+
+class ProgressDialog:
+    """Ventana con barra de progreso determinada (o indeterminada si no hay total de pasos)"""
+    
+    def __init__(self, parent, title, total_steps):
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(title)
+        self.dialog.resizable(False, False)
+        
+        # Tamaño y posición centrada
+        x = (self.dialog.winfo_screenwidth() // 2) - (350 // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (130 // 2)
+        self.dialog.geometry(f"350x130+{x}+{y}")
+        
+        # Modal
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", lambda: None)
+        
+        # Widgets
+        main_frame = ttk.Frame(self.dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        self.message_label = ttk.Label(main_frame, text="Iniciando...")
+        self.message_label.pack(pady=(0, 10))
+        
+        # Barra de progreso
+        if total_steps:
+            self.progress = ttk.Progressbar(main_frame, maximum=total_steps, value=0)
+        else:
+            self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+            self.progress.start(10)
+        
+        self.progress.pack(fill=tk.X, pady=(0, 10))
+        
+        # Label de progreso
+        self.progress_label = ttk.Label(main_frame, text="")
+        self.progress_label.pack()
+        
+        self.current_step = 0
+        self.total_steps = total_steps
+    
+    def update_progress(self, message, steps=1):
+        self.message_label.config(text=message)
+        if self.total_steps:
+            self.current_step += steps
+            self.progress['value'] = self.current_step
+            self.progress_label.config(text=f"{self.current_step}/{self.total_steps}")
+        self.dialog.update_idletasks()
+    
+    def close(self):
+        if not self.total_steps:
+            self.progress.stop()
+        self.dialog.grab_release()
+        self.dialog.destroy()
+
 def run_with_loading_dialog(parent, operation_func, title="Cargando...", message="Por favor espere..."):
     """
     Ejecuta una operación en segundo plano mientras muestra ventana de carga.
@@ -192,80 +244,43 @@ def run_with_progress_steps(parent, steps_func, title="Procesando...", total_ste
         title: Título de la ventana
         total_steps: Número total de pasos (opcional)
     """
-    
-    class ProgressDialog:
-        def __init__(self, parent, title, total_steps):
-            self.dialog = tk.Toplevel(parent)
-            self.dialog.title(title)
-            self.dialog.geometry("350x130")
-            self.dialog.resizable(False, False)
-            
-            # Centrar
-            self.dialog.update_idletasks()
-            x = (self.dialog.winfo_screenwidth() // 2) - (350 // 2)
-            y = (self.dialog.winfo_screenheight() // 2) - (130 // 2)
-            self.dialog.geometry(f"350x130+{x}+{y}")
-            
-            # Modal
-            self.dialog.transient(parent)
-            self.dialog.grab_set()
-            self.dialog.protocol("WM_DELETE_WINDOW", lambda: None)
-            
-            # Widgets
-            main_frame = ttk.Frame(self.dialog)
-            main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-            
-            self.message_label = ttk.Label(main_frame, text="Iniciando...")
-            self.message_label.pack(pady=(0, 10))
-            
-            # Barra de progreso
-            if total_steps:
-                self.progress = ttk.Progressbar(main_frame, maximum=total_steps, value=0)
-            else:
-                self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-                self.progress.start(10)
-            
-            self.progress.pack(fill=tk.X, pady=(0, 10))
-            
-            # Label de progreso
-            self.progress_label = ttk.Label(main_frame, text="")
-            self.progress_label.pack()
-            
-            self.current_step = 0
-            self.total_steps = total_steps
-        
-        def update_progress(self, message):
-            self.message_label.config(text=message)
-            if self.total_steps:
-                self.current_step += 1
-                self.progress['value'] = self.current_step
-                self.progress_label.config(text=f"{self.current_step}/{self.total_steps}")
-            self.dialog.update()
-        
-        def close(self):
-            if not self.total_steps:
-                self.progress.stop()
-            self.dialog.grab_release()
-            self.dialog.destroy()
-    
     # Crear ventana de progreso
     progress_dialog = ProgressDialog(parent, title, total_steps)
     
+    # El hilo deja los mensajes en una cola y el hilo de Tk los muestra cada
+    # 50 ms, en lugar de programar un after() por cada paso
+    msg_queue = queue.Queue()
+    done = [False]
+    
     def worker():
         try:
             # Ejecutar pasos
             for step_message in steps_func():
-                parent.after(0, lambda msg=step_message: progress_dialog.update_progress(msg))
-                time.sleep(0.1)  # Pequeña pausa para ver el progreso
-        except Exception as e:
-            parent.after(0, lambda: progress_dialog.close())
-            raise e
+                msg_queue.put(step_message)
         finally:
-            parent.after(0, lambda: progress_dialog.close())
+            done[0] = True
+    
+    def drain():
+        # Leer done antes de vaciar la cola: si ya terminó, no quedan mensajes por llegar
+        finished = done[0]
+        messages = []
+        try:
+            while True:
+                messages.append(msg_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if messages:
+            # Mostrar solo el último mensaje, avanzando la barra por todos
+            progress_dialog.update_progress(messages[-1], steps=len(messages))
+        if finished:
+            progress_dialog.close()
+        else:
+            parent.after(50, drain)
     
     # Ejecutar en hilo separado
     thread = threading.Thread(target=worker, daemon=True)
     thread.start()
+    parent.after(50, drain)
     
     # Esperar
     parent.wait_window(progress_dialog.dialog)
@@ -2,26 +2,73 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import os
 import getpass
+import functools
 import hashlib
+import hmac
+import secrets
+import base64
+import logging
+import time
 from datetime import datetime
 import platform
 
+from json_utils import read_json, encode_json, write_json_bytes
+
+log = logging.getLogger(__name__)
+
+
+def _display_name(system_user):
+    """Obtener nombre de display del usuario del sistema"""
+    try:
+        if platform.system() == "Linux":
+            # Intentar obtener el nombre real del usuario
+            import pwd
+            user_info = pwd.getpwnam(system_user)
+            full_name = user_info.pw_gecos.split(',')[0]
+            return full_name if full_name else system_user.title()
+        else:
+            return system_user.title()
+    except (KeyError, ImportError):
+        # Usuario sin entrada en la base de usuarios, o sin módulo pwd
+        return system_user.title()
+
+
+def _now_iso():
+    """Fecha y hora local actual en ISO 8601, con precisión de segundos"""
+    return datetime.fromtimestamp(time.time()).isoformat(timespec='seconds')
+
+
+@functools.cache
+def _system_identity():
+    """
+    (usuario, nombre de display) del usuario del sistema.
+    Se calcula una sola vez por proceso: un cambio de $USER durante la
+    ejecución no se refleja.
+    """
+    system_user = getpass.getuser()
+    return system_user, _display_name(system_user)
+
 class UserManager:
+    # Datos de usuarios ya leídos, por archivo: {ruta: (mtime_ns, tamaño, datos)}.
+    # Si el archivo no cambió desde la última lectura no se vuelve a parsear
+    _users_cache = {}
+    # Cada usuario ya serializado, por archivo: {ruta: {usuario: bytes}}.
+    # Al guardar solo se vuelven a serializar los usuarios modificados
+    _encoded_cache = {}
+    
     def __init__(self, parent=None, data_file="users.json"):
         self.parent = parent
         self.data_file = data_file
         self.current_user = None
-        self.users_data = {}
-        
-        # Información del usuario del sistema
-        self.system_user = getpass.getuser()
-        self.system_name = self._get_system_display_name()
+        # Datos de usuarios; se leen del archivo la primera vez que se usan (ver users_data)
+        self._users_data = None
+        # Guardado diferido pendiente (ver schedule_save)
+        self._save_job = None
         
-        # Cargar datos existentes
-        self.load_users_data()
+        # Información del usuario del sistema (se consulta una vez por proceso)
+        self.system_user, self.system_name = _system_identity()
         
         # Crear ventana si no hay parent
         if parent is None:
@@ -33,6 +80,9 @@ class UserManager:
             self.root.transient(parent)
             self.root.grab_set()
         
+        # Cerrar con la X también guarda lo pendiente
+        self.root.protocol("WM_DELETE_WINDOW", self.close_manager)
+        
         self.root.geometry("400x500")
         self.root.resizable(False, False)
         
@@ -53,45 +103,115 @@ class UserManager:
         y = (self.root.winfo_screenheight() // 2) - (500 // 2)
         self.root.geometry(f"400x500+{x}+{y}")
     
-    def _get_system_display_name(self):
-        """Obtener nombre de display del usuario del sistema"""
-        try:
-            if platform.system() == "Linux":
-                # Intentar obtener el nombre real del usuario
-                import pwd
-                user_info = pwd.getpwnam(self.system_user)
-                full_name = user_info.pw_gecos.split(',')[0]
-                return full_name if full_name else self.system_user.title()
-            else:
-                return self.system_user.title()
-        except:
-            return self.system_user.title()
+    @property
+    def users_data(self):
+        """Datos de usuarios, leídos del archivo en el primer acceso"""
+        if self._users_data is None:
+            self.load_users_data()
+        return self._users_data
     
     def load_users_data(self):
-        """Cargar datos de usuarios desde archivo JSON"""
+        """Cargar datos de usuarios desde archivo JSON (o del cache si no cambió)"""
+        cache_key = os.path.abspath(self.data_file)
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.users_data = json.load(f)
+            if os.path.isfile(self.data_file):
+                file_stat = os.stat(self.data_file)
+                cached = UserManager._users_cache.get(cache_key)
+                if cached and cached[:2] == (file_stat.st_mtime_ns, file_stat.st_size):
+                    self._users_data = cached[2]
+                    return
+                self._users_data = read_json(self.data_file)
+                UserManager._users_cache[cache_key] = (file_stat.st_mtime_ns, file_stat.st_size, self._users_data)
+                UserManager._encoded_cache[cache_key] = {}
             else:
-                self.users_data = {}
+                self._users_data = {}
         except Exception as e:
-            print(f"Error cargando usuarios: {e}")
-            self.users_data = {}
+            log.warning("Error cargando usuarios: %s", e)
+            self._users_data = {}
+    
+    def schedule_save(self):
+        """
+        Programar el guardado de los usuarios para dentro de 500 ms: varios
+        cambios seguidos (p. ej. fechas de último acceso) se escriben una sola vez
+        """
+        if self._save_job is None:
+            self._save_job = self.root.after(500, self.save_users_data)
     
     def save_users_data(self):
         """Guardar datos de usuarios a archivo JSON"""
+        # Este guardado incluye cualquier cambio que estuviera programado
+        if self._save_job is not None:
+            self.root.after_cancel(self._save_job)
+            self._save_job = None
+        
+        cache_key = os.path.abspath(self.data_file)
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.users_data, f, indent=2, ensure_ascii=False)
+            write_json_bytes(self.data_file, self.encode_users_data())
+            # Lo guardado pasa a ser el contenido cacheado del archivo
+            file_stat = os.stat(self.data_file)
+            UserManager._users_cache[cache_key] = (file_stat.st_mtime_ns, file_stat.st_size, self.users_data)
             return True
         except Exception as e:
+            # Los datos en memoria ya no coinciden con el archivo
+            UserManager._users_cache.pop(cache_key, None)
             messagebox.showerror("Error", f"Error guardando usuarios: {e}")
             return False
     
-    def hash_password(self, password):
-        """Hash simple de contraseña (no seguro para producción)"""
-        return hashlib.sha256(password.encode()).hexdigest()
+    def touch_user(self, username):
+        """Marcar un usuario como modificado, para serializarlo de nuevo al guardar"""
+        self._encoded_users().pop(username, None)
+    
+    def _encoded_users(self):
+        """Cache de usuarios serializados correspondiente al archivo de datos"""
+        return UserManager._encoded_cache.setdefault(os.path.abspath(self.data_file), {})
+    
+    def encode_users_data(self):
+        """
+        Serializar users_data reutilizando los usuarios ya serializados.
+        Produce el mismo JSON compacto que serializar el dict completo.
+        """
+        encoded_users = self._encoded_users()
+        parts = []
+        for username, record in self.users_data.items():
+            encoded = encoded_users.get(username)
+            if encoded is None:
+                encoded = encode_json(record)
+                encoded_users[username] = encoded
+            parts.append(encode_json(username) + b':' + encoded)
+        return b'{' + b','.join(parts) + b'}'
+    
+    def hash_password(self, password, salt):
+        """Hash de contraseña con BLAKE2b, usando la sal del usuario como clave"""
+        return hashlib.blake2b(password.encode(), key=salt, digest_size=32).hexdigest()
+    
+    def new_password_fields(self, password):
+        """Campos a guardar en el usuario para una contraseña: hash y sal (en base64)"""
+        salt = secrets.token_bytes(16)
+        return {
+            'password_hash': self.hash_password(password, salt),
+            'password_salt': base64.b64encode(salt).decode('ascii')
+        }
+    
+    def check_password(self, user_data, password):
+        """
+        Verificar la contraseña de un usuario (comparación en tiempo constante).
+        Los usuarios creados antes de usar sal tienen un SHA-256 simple: si la
+        contraseña es correcta se actualizan al formato nuevo.
+        """
+        stored_hash = user_data.get('password_hash')
+        if not stored_hash:
+            return False
+        
+        encoded_salt = user_data.get('password_salt')
+        if encoded_salt:
+            salt = base64.b64decode(encoded_salt)
+            return hmac.compare_digest(stored_hash, self.hash_password(password, salt))
+        
+        legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+        if not hmac.compare_digest(stored_hash, legacy_hash):
+            return False
+        user_data.update(self.new_password_fields(password))
+        return True
     
     def create_widgets(self):
         """Crear widgets principales"""
@@ -106,20 +226,40 @@ class UserManager:
         # Frame de contenido (se cambiará según la vista)
         self.content_frame = ttk.Frame(self.main_frame)
         self.content_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Frames de cada vista: se construyen la primera vez que se muestran
+        # y después solo se ocultan y vuelven a mostrar
+        self._login_frame = None
+        self._register_frame = None
+        self._profile_frame = None
     
-    def clear_content(self):
-        """Limpiar contenido actual"""
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+    def show_frame(self, frame):
+        """Mostrar el frame de una vista y ocultar los demás"""
+        for view_frame in (self._login_frame, self._register_frame, self._profile_frame):
+            if view_frame is not None and view_frame is not frame:
+                view_frame.pack_forget()
+        frame.pack(fill=tk.BOTH, expand=True)
     
     def show_login_view(self):
         """Mostrar vista de login"""
         self.current_view = "login"
-        self.clear_content()
         self.title_label.config(text="Iniciar Sesión")
+        if self._login_frame is None:
+            self._login_frame = self.build_login_frame()
+        
+        # Campos vacíos y lista de usuarios al día, como en una vista nueva
+        self.login_username.delete(0, tk.END)
+        self.login_password.delete(0, tk.END)
+        # La lista necesita leer users.json: se carga después de dibujar la ventana
+        self.root.after_idle(self.refresh_users_list)
+        self.show_frame(self._login_frame)
+    
+    def build_login_frame(self):
+        """Construir los widgets de la vista de login"""
+        frame = ttk.Frame(self.content_frame)
         
         # Opción 1: Usuario del sistema
-        system_frame = ttk.LabelFrame(self.content_frame, text="Acceso Rápido")
+        system_frame = ttk.LabelFrame(frame, text="Acceso Rápido")
         system_frame.pack(fill=tk.X, pady=(0, 20))
         
         system_info = ttk.Label(
@@ -137,10 +277,10 @@ class UserManager:
         system_button.pack(pady=(0, 10))
         
         # Separador
-        ttk.Separator(self.content_frame, orient='horizontal').pack(fill=tk.X, pady=10)
+        ttk.Separator(frame, orient='horizontal').pack(fill=tk.X, pady=10)
         
         # Opción 2: Login con cuenta personalizada
-        login_frame = ttk.LabelFrame(self.content_frame, text="Cuenta Personalizada")
+        login_frame = ttk.LabelFrame(frame, text="Cuenta Personalizada")
         login_frame.pack(fill=tk.X, pady=(0, 20))
         
         # Usuario
@@ -161,59 +301,87 @@ class UserManager:
         ttk.Button(button_frame, text="Iniciar Sesión", command=self.login_user).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Crear Cuenta", command=self.show_register_view).pack(side=tk.LEFT)
         
-        # Lista de usuarios existentes (para desarrollo/debug)
+        # Lista de usuarios existentes (para desarrollo/debug); se muestra
+        # solo si hay usuarios (ver refresh_users_list)
+        self.users_frame = ttk.LabelFrame(frame, text="Usuarios Registrados")
+        
+        # Listbox con scroll
+        users_scrollbar = ttk.Scrollbar(self.users_frame)
+        users_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
+        self.users_listbox = tk.Listbox(self.users_frame, height=4, foreground='gray',
+                                        yscrollcommand=users_scrollbar.set)
+        self.users_listbox.pack(fill=tk.X, padx=5, pady=5)
+        users_scrollbar.config(command=self.users_listbox.yview)
+        
+        return frame
+    
+    def refresh_users_list(self):
+        """Cargar la lista de usuarios registrados (con una sola llamada a insert)"""
+        if not self.users_listbox.winfo_exists():
+            return  # La ventana se cerró antes de cargar la lista
+        self.users_listbox.delete(0, tk.END)
         if self.users_data:
-            users_frame = ttk.LabelFrame(self.content_frame, text="Usuarios Registrados")
-            users_frame.pack(fill=tk.X, pady=(10, 0))
-            
-            users_list = ", ".join(self.users_data.keys())
-            ttk.Label(users_frame, text=users_list, foreground='gray').pack(pady=5)
+            self.users_listbox.insert(tk.END, *self.users_data.keys())
+            self.users_frame.pack(fill=tk.X, pady=(10, 0))
+        else:
+            self.users_frame.pack_forget()
     
     def show_register_view(self):
         """Mostrar vista de registro"""
         self.current_view = "register"
-        self.clear_content()
         self.title_label.config(text="Crear Cuenta")
+        if self._register_frame is None:
+            self._register_frame = self.build_register_frame()
+        
+        # Empezar siempre con el formulario vacío
+        for entry in (self.reg_username, self.reg_fullname, self.reg_email,
+                      self.reg_password, self.reg_password_confirm):
+            entry.delete(0, tk.END)
+        self.show_frame(self._register_frame)
+    
+    def build_register_frame(self):
+        """Construir los widgets de la vista de registro"""
+        frame = ttk.Frame(self.content_frame)
         
         # Campos de registro
-        ttk.Label(self.content_frame, text="Nombre de usuario:").pack(anchor='w', pady=(0, 5))
-        self.reg_username = ttk.Entry(self.content_frame, width=30)
+        ttk.Label(frame, text="Nombre de usuario:").pack(anchor='w', pady=(0, 5))
+        self.reg_username = ttk.Entry(frame, width=30)
         self.reg_username.pack(fill=tk.X, pady=(0, 10))
         
-        ttk.Label(self.content_frame, text="Nombre completo:").pack(anchor='w', pady=(0, 5))
-        self.reg_fullname = ttk.Entry(self.content_frame, width=30)
+        ttk.Label(frame, text="Nombre completo:").pack(anchor='w', pady=(0, 5))
+        self.reg_fullname = ttk.Entry(frame, width=30)
         self.reg_fullname.pack(fill=tk.X, pady=(0, 10))
         
-        ttk.Label(self.content_frame, text="Email (opcional):").pack(anchor='w', pady=(0, 5))
-        self.reg_email = ttk.Entry(self.content_frame, width=30)
+        ttk.Label(frame, text="Email (opcional):").pack(anchor='w', pady=(0, 5))
+        self.reg_email = ttk.Entry(frame, width=30)
         self.reg_email.pack(fill=tk.X, pady=(0, 10))
         
-        ttk.Label(self.content_frame, text="Contraseña:").pack(anchor='w', pady=(0, 5))
-        self.reg_password = ttk.Entry(self.content_frame, show="*", width=30)
+        ttk.Label(frame, text="Contraseña:").pack(anchor='w', pady=(0, 5))
+        self.reg_password = ttk.Entry(frame, show="*", width=30)
         self.reg_password.pack(fill=tk.X, pady=(0, 10))
         
-        ttk.Label(self.content_frame, text="Confirmar contraseña:").pack(anchor='w', pady=(0, 5))
-        self.reg_password_confirm = ttk.Entry(self.content_frame, show="*", width=30)
+        ttk.Label(frame, text="Confirmar contraseña:").pack(anchor='w', pady=(0, 5))
+        self.reg_password_confirm = ttk.Entry(frame, show="*", width=30)
         self.reg_password_confirm.pack(fill=tk.X, pady=(0, 20))
         self.reg_password_confirm.bind('<Return>', lambda e: self.register_user())
         
         # Botones
-        button_frame = ttk.Frame(self.content_frame)
+        button_frame = ttk.Frame(frame)
         button_frame.pack(fill=tk.X)
         
         ttk.Button(button_frame, text="Crear Cuenta", command=self.register_user).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Cancelar", command=self.show_login_view).pack(side=tk.LEFT)
+        
+        return frame
     
     def show_profile_view(self):
         """Mostrar vista de perfil/gestión"""
         self.current_view = "profile"
-        self.clear_content()
         self.title_label.config(text=f"Perfil de {self.current_user['display_name']}")
+        if self._profile_frame is None:
+            self._profile_frame = self.build_profile_frame()
         
         # Información del usuario
-        info_frame = ttk.LabelFrame(self.content_frame, text="Información del Usuario")
-        info_frame.pack(fill=tk.X, pady=(0, 20))
-        
         info_text = f"""
 Usuario: {self.current_user['username']}
 Nombre: {self.current_user['display_name']}
@@ -221,55 +389,77 @@ Email: {self.current_user.get('email', 'No especificado')}
 Tipo: {self.current_user['type']}
 Último acceso: {self.current_user['last_login']}
         """.strip()
-        
-        ttk.Label(info_frame, text=info_text, justify=tk.LEFT).pack(pady=10, padx=10)
+        self.profile_info.config(text=info_text)
         
         # Opciones de gestión
         if self.current_user['type'] == 'custom':
             # Solo usuarios personalizados pueden editar perfil
-            edit_frame = ttk.LabelFrame(self.content_frame, text="Editar Perfil")
-            edit_frame.pack(fill=tk.X, pady=(0, 20))
-            
-            ttk.Label(edit_frame, text="Nombre completo:").pack(anchor='w', pady=(10, 5))
-            self.edit_fullname = ttk.Entry(edit_frame, width=30)
-            self.edit_fullname.pack(fill=tk.X, padx=10)
+            self.edit_fullname.delete(0, tk.END)
             self.edit_fullname.insert(0, self.current_user['display_name'])
-            
-            ttk.Label(edit_frame, text="Email:").pack(anchor='w', pady=(10, 5))
-            self.edit_email = ttk.Entry(edit_frame, width=30)
-            self.edit_email.pack(fill=tk.X, padx=10)
+            self.edit_email.delete(0, tk.END)
             self.edit_email.insert(0, self.current_user.get('email', ''))
-            
-            ttk.Button(edit_frame, text="Guardar Cambios", command=self.save_profile_changes).pack(pady=10)
+            self.edit_frame.pack(fill=tk.X, pady=(0, 20), before=self.profile_action_frame)
+        else:
+            self.edit_frame.pack_forget()
+        
+        self.show_frame(self._profile_frame)
+    
+    def build_profile_frame(self):
+        """Construir los widgets de la vista de perfil (los datos los carga show_profile_view)"""
+        frame = ttk.Frame(self.content_frame)
+        
+        # Información del usuario
+        info_frame = ttk.LabelFrame(frame, text="Información del Usuario")
+        info_frame.pack(fill=tk.X, pady=(0, 20))
+        
+        self.profile_info = ttk.Label(info_frame, justify=tk.LEFT)
+        self.profile_info.pack(pady=10, padx=10)
+        
+        # Edición de perfil (se muestra solo a usuarios personalizados)
+        self.edit_frame = ttk.LabelFrame(frame, text="Editar Perfil")
+        
+        ttk.Label(self.edit_frame, text="Nombre completo:").pack(anchor='w', pady=(10, 5))
+        self.edit_fullname = ttk.Entry(self.edit_frame, width=30)
+        self.edit_fullname.pack(fill=tk.X, padx=10)
+        
+        ttk.Label(self.edit_frame, text="Email:").pack(anchor='w', pady=(10, 5))
+        self.edit_email = ttk.Entry(self.edit_frame, width=30)
+        self.edit_email.pack(fill=tk.X, padx=10)
+        
+        ttk.Button(self.edit_frame, text="Guardar Cambios", command=self.save_profile_changes).pack(pady=10)
         
         # Botones de acción
-        action_frame = ttk.Frame(self.content_frame)
-        action_frame.pack(fill=tk.X, pady=(10, 0))
+        self.profile_action_frame = ttk.Frame(frame)
+        self.profile_action_frame.pack(fill=tk.X, pady=(10, 0))
         
-        ttk.Button(action_frame, text="Cerrar Sesión", command=self.logout).pack(side=tk.LEFT)
+        ttk.Button(self.profile_action_frame, text="Cerrar Sesión", command=self.logout).pack(side=tk.LEFT)
         
         if self.parent:
-            ttk.Button(action_frame, text="Continuar", command=self.close_manager).pack(side=tk.RIGHT)
+            ttk.Button(self.profile_action_frame, text="Continuar", command=self.close_manager).pack(side=tk.RIGHT)
+        
+        return frame
     
     def login_as_system_user(self):
         """Iniciar sesión como usuario del sistema"""
         username = f"system_{self.system_user}"
         
         # Crear o actualizar usuario del sistema
+        now = _now_iso()
         if username not in self.users_data:
             self.users_data[username] = {
                 'username': username,
                 'display_name': self.system_name,
                 'email': '',
                 'type': 'system',
-                'created': datetime.now().isoformat(),
-                'last_login': datetime.now().isoformat()
+                'created': now,
+                'last_login': now
             }
         else:
-            self.users_data[username]['last_login'] = datetime.now().isoformat()
+            self.users_data[username]['last_login'] = now
+        self.touch_user(username)
         
         self.current_user = self.users_data[username]
-        self.save_users_data()
+        self.schedule_save()
         self.close_manager()
         #self.show_profile_view()
     
@@ -287,14 +477,15 @@ Tipo: {self.current_user['type']}
             return
         
         user_data = self.users_data[username]
-        if user_data.get('password_hash') != self.hash_password(password):
+        if not self.check_password(user_data, password):
             messagebox.showerror("Error", "Contraseña incorrecta")
             return
         
         # Login exitoso
-        user_data['last_login'] = datetime.now().isoformat()
+        user_data['last_login'] = _now_iso()
+        self.touch_user(username)
         self.current_user = user_data
-        self.save_users_data()
+        self.schedule_save()
         
         self.show_profile_view()
     
@@ -320,15 +511,17 @@ Tipo: {self.current_user['type']}
             return
         
         # Crear usuario
+        now = _now_iso()
         self.users_data[username] = {
             'username': username,
             'display_name': fullname,
             'email': email,
-            'password_hash': self.hash_password(password),
+            **self.new_password_fields(password),
             'type': 'custom',
-            'created': datetime.now().isoformat(),
-            'last_login': datetime.now().isoformat()
+            'created': now,
+            'last_login': now
         }
+        self.touch_user(username)
         
         if self.save_users_data():
             self.current_user = self.users_data[username]
@@ -347,12 +540,16 @@ Tipo: {self.current_user['type']}
             messagebox.showerror("Error", "El nombre no puede estar vacío")
             return
         
-        # Actualizar datos
+        # Si no cambió nada no hace falta reescribir el archivo
+        if (new_fullname == self.current_user['display_name']
+                and new_email == self.current_user.get('email', '')):
+            messagebox.showinfo("Éxito", "Perfil actualizado correctamente")
+            return
+        
+        # Actualizar datos (current_user es el mismo dict que está en users_data)
         self.current_user['display_name'] = new_fullname
         self.current_user['email'] = new_email
-        
-        username = self.current_user['username']
-        self.users_data[username] = self.current_user
+        self.touch_user(self.current_user['username'])
         
         if self.save_users_data():
             messagebox.showinfo("Éxito", "Perfil actualizado correctamente")
@@ -365,6 +562,9 @@ Tipo: {self.current_user['type']}
     
     def close_manager(self):
         """Cerrar el gestor de usuarios"""
+        # Escribir ya lo que quedó programado, antes de destruir la ventana
+        if self._save_job is not None:
+            self.save_users_data()
         if self.parent:
             self.root.grab_release()
         self.root.destroy()
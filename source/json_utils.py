@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import json
+import os
+
+# orjson es opcional: si está instalado se usa para leer y escribir JSON
+# (bastante más rápido), si no se usa el módulo json estándar
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def read_json(path):
+    """
+    Leer y parsear un archivo JSON (UTF-8).
+    
+    Lanza FileNotFoundError si no existe y json.JSONDecodeError si el contenido
+    no es válido (orjson.JSONDecodeError es subclase de esta).
+    """
+    # Todo el archivo en una sola lectura, sin buffer intermedio: el archivo
+    # crudo usa el tamaño del archivo para reservar memoria una vez
+    with open(path, 'rb', buffering=0) as f:
+        content = f.read()
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def encode_json(data, pretty=False):
+    """
+    Serializar data como JSON en UTF-8 (sin escapar caracteres no ASCII).
+    
+    Por defecto sin espacios ni saltos de línea: los archivos del proyecto y
+    de usuarios los lee el programa. Con pretty=True se indenta para lectura humana.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def write_json_bytes(path, content):
+    """Guardar en un archivo un JSON ya serializado (bytes)"""
+    # Un solo write del contenido completo (el BufferedWriter lo pasa directo
+    # al archivo por ser más grande que su buffer, y reintenta escrituras parciales).
+    # Se escribe con otro nombre y se renombra, para que un corte a mitad de
+    # escritura nunca deje el archivo original truncado
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_json(path, data, pretty=False):
+    """Guardar data como JSON en UTF-8 (ver encode_json)"""
+    write_json_bytes(path, encode_json(data, pretty))
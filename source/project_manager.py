@@ -2,53 +2,92 @@
 
 import json
 import os
+import stat
+import functools
+import logging
 from slugify import slugify
 
+from json_utils import read_json, write_json
+
 # cuando mejores las funciones de bundle
 #import bundle_types
 
+log = logging.getLogger(__name__)
+
 def is_copista_project(directory):
     """ una confirmacion rapida de que la carpeta es un proyecto copista """
     path_to_check = os.path.join(directory, 'bundles.json')   
-    if os.path.isfile(path_to_check):
-        return True
-    else:
+    try:
+        return stat.S_ISREG(os.stat(path_to_check).st_mode)
+    except OSError:
         return False
     
 class Project:
     def __init__(self, directory):
-        self.directory = directory
+        self._directory = directory
         self.project_metadata = {
             "title" : None,
             "description" : None
         }
         self.bundles = []
-        self.files = {
-            "bundles": os.path.join(self.directory, "bundles.json"),
-            "project_metadata": os.path.join(self.directory, "project_metadata.json"),
-            "documents_metadata": os.path.join(self.directory, "documents_metadata.json"),
-        }
-        self.subfolders = {
-            "cache_subfolder": os.path.join(self.directory, ".cache"),
-            "capture_subfolder": os.path.join(self.directory, ".capture")
-        }
+        # Tipo y cantidad de imágenes de cada bundle, en el mismo orden que
+        # self.bundles (ver index_bundles)
+        self.bundle_types = []
+        self.bundle_image_counts = []
+
+    # Rutas de archivos y subcarpetas del proyecto: se calculan la primera vez
+    # que se usan. El directorio es de solo lectura para que sigan siendo válidas
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @functools.cached_property
+    def bundles_path(self):
+        return os.path.join(self._directory, "bundles.json")
+
+    @functools.cached_property
+    def project_metadata_path(self):
+        return os.path.join(self._directory, "project_metadata.json")
+
+    @functools.cached_property
+    def documents_metadata_path(self):
+        return os.path.join(self._directory, "documents_metadata.json")
+
+    @functools.cached_property
+    def cache_subfolder(self):
+        return os.path.join(self._directory, ".cache")
+
+    @functools.cached_property
+    def capture_subfolder(self):
+        return os.path.join(self._directory, ".capture")
 
     def load_bundles(self):
-        result, message, bundles = self.load_from_json(self.files["bundles"], 'bundles')
+        result, message, bundles = self.load_from_json(self.bundles_path, 'bundles')
         if not result:
             return False, message
         self.bundles = bundles
+        self.index_bundles()
         return True, None
 
+    def index_bundles(self):
+        """
+        Precalcular tipo y cantidad de imágenes de cada bundle, para que la
+        navegación no tenga que consultarlos en cada bundle.
+        Llamar de nuevo después de modificar self.bundles.
+        """
+        self.bundle_types = [bundle.get('type', 'generic') for bundle in self.bundles]
+        self.bundle_image_counts = [len(bundle.get('images', [])) for bundle in self.bundles]
+
     def save_bundles(self):
         bundles = {"bundles": self.bundles}     
-        result, message = self.save_to_json(self.files["bundles"], bundles)
+        result, message = self.save_to_json(self.bundles_path, bundles)
         if not result:
             return False, message
         return True, message
 
     def load_project_metadata(self):
-        result, message, project_metadata = self.load_from_json(self.files["project_metadata"], 'project_metadata')
+        result, message, project_metadata = self.load_from_json(self.project_metadata_path, 'project_metadata')
         if not result:
             return False, message
         self.project_metadata = project_metadata
@@ -56,7 +95,7 @@ class Project:
 
     def save_project_metadata(self):
         project_metadata = {"project_metadata": self.project_metadata}     
-        result, message = self.save_to_json(self.files["project_metadata"], project_metadata)
+        result, message = self.save_to_json(self.project_metadata_path, project_metadata)
         if not result:
             return False, message
         return True, message
@@ -65,10 +104,16 @@ class Project:
         """
         Cargar data desde el archivo JSON
         """
+        # El caso de archivo faltante se resuelve con un stat, sin pasar por
+        # la excepción (el except queda por si se borra justo entre medio)
+        if not os.path.isfile(file):
+            filename = os.path.basename(file)
+            message = ("Error", f"No existe {filename} en el proyecto")
+            return False, message, None
+        
         try:
-            with open(file, 'r') as f:
-                data = json.load(f)
-                item = data.get(item_name, [])
+            data = read_json(file)
+            item = data.get(item_name, [])
         except FileNotFoundError:
             filename = os.path.basename(file)
             message = ("Error", f"No existe {filename} en el proyecto")
@@ -84,13 +129,13 @@ class Project:
         message = ("Advertencia", "No se encontro {item_name} en el archivo JSON") if not item else None           
         return True, message, item
         
-    def save_to_json(self, file, data):
+    def save_to_json(self, file, data, pretty=False):
         """
         Actualiza un archivo json con la data actual
+        (compacto, o indentado si pretty es True)
         """
         try:
-            with open(file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_json(file, data, pretty)
         except Exception as e:
             message = ("Error", f"Error actualizando {file}: {str(e)}")
             return False, message
@@ -98,10 +143,19 @@ class Project:
             
     def ensure_subfolders(self):
         """Verifica si las subcarpetas de proyecto estan presentes, sino las crea"""
-        for subfolder in self.subfolders.values():        
+        # Una sola lectura del proyecto para saber cuáles ya existen
+        try:
+            with os.scandir(self.directory) as entries:
+                existing = {entry.name for entry in entries if entry.is_dir()}
+        except FileNotFoundError:
+            existing = set()
+        
+        for subfolder in (self.cache_subfolder, self.capture_subfolder):        
+            if os.path.basename(subfolder) in existing:
+                continue
             try:
                 os.makedirs(subfolder, exist_ok=True)
-                print(f"Directorio creado o ya existía: {subfolder}")
+                log.debug("Directorio creado: %s", subfolder)
             except OSError as e:
                 message = ("Error", f"Error al crear {subfolder}: {e}")
                 return False, message
@@ -134,14 +188,22 @@ class ProjectManager:
             return False
         slug = slugify(title)
         parent = parent_directory if parent_directory else self.config['base_projects_folder']
-        new_directory = os.path.join(parent, slug)
+        
+        # Nombres ya usados en el directorio padre, con una sola lectura
+        # (en lugar de un stat por cada número probado)
+        try:
+            with os.scandir(parent) as entries:
+                existing = {entry.name for entry in entries}
+        except FileNotFoundError:
+            existing = set()
         
         # Si el archivo ya existe, agregar número secuencial
+        new_slug = slug
         counter = 1
-        while os.path.exists(new_directory):
-            alt_slug = f"{slug}_{counter:03d}"
-            new_directory = os.path.join(parent, alt_slug)
+        while new_slug in existing:
+            new_slug = f"{slug}_{counter:03d}"
             counter += 1
+        new_directory = os.path.join(parent, new_slug)
 
         new_project = Project(new_directory)
         new_project.project_metadata["title"] = title
@@ -197,7 +259,7 @@ class ProjectManager:
                 if os.path.exists(file_path):
                     os.remove(file_path)
             except Exception as e:
-                print(f"Advertencia: No se pudo eliminar {filename}: {str(e)}")
+                log.warning("No se pudo eliminar %s: %s", filename, e)
 
     def insert_bundle(self, image_paths, bundle_type, index):
         # TODO: copia las imagenes e inserta el bundle en bundle.json